@@ -3,8 +3,9 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
-from qec.analytics import repetition_mc_error
+from qec.analytics import repetition_logical_exact, repetition_mc_error
 from qec.challenges import Challenge, check_smallest_n_below, check_threshold
+from qec.sweep import crn_repetition_sweep
 
 st.header("Classical Repetition Code")
 
@@ -117,7 +118,8 @@ with left:
 with right:
     st.subheader("Activity 2 · Sweep over $n$ at fixed $p$")
     st.caption(
-        "Fix $p$, then compare how the logical error changes as you increase redundancy."
+        "Fix $p$, then compare how the logical error changes as you increase redundancy. "
+        "All $n$ share the same random draws, so differences between points reflect the code, not the noise."
     )
     with st.form(key="rep_sweep_form", clear_on_submit=False):
         p2 = st.slider(
@@ -132,12 +134,21 @@ with right:
             options=[1, 3, 5, 7, 9, 11, 13],
             help="Pick which repetition lengths to include in the sweep.",
         )
+        sweep_mode = st.radio(
+            "Estimator",
+            ["Monte Carlo", "Exact (binomial tail)"],
+            horizontal=True,
+            key="rep_sweep_mode",
+        )
         run_sweep = st.form_submit_button("Run sweep")
     if run_sweep:
         ns = np.array(sorted(set(int(x) for x in ns_opts)))
-        rates = [
-            repetition_mc_error(int(ni), float(p2), int(trial_per_point)) for ni in ns
-        ]
+        if sweep_mode == "Monte Carlo":
+            # one shared block of random numbers for all n -> smooth curve
+            sweep_df = crn_repetition_sweep(ns, [float(p2)], int(trial_per_point))
+            rates = sweep_df["rate"].tolist()
+        else:
+            rates = repetition_logical_exact(ns, float(p2)).tolist()
         df = pd.DataFrame({"n": ns, "logical_error": rates})
         st.session_state["rep_sweep_df"] = df
         st.session_state["rep_sweep_curve"] = list(zip(ns.tolist(), rates))
@@ -2,12 +2,11 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
-from qec.analytics import bitflip_mc_error
+from qec.analytics import repetition_mc_error
 from qec.challenges import Challenge, check_threshold
 from qec.circuits import bitflip_encode_circuit, bitflip_syndrome_circuit, draw_circuit
-from qec.codes import ThreeQubitBitFlip
-from qec.decoders import lookup_decoder_3q
-from qec.error_models import bsc_flip_mask
+from qec.codes import repetition_code, three_qubit_code
+from qec.error_models import RandomPool, bsc_flip_mask
 
 st.header("3-Qubit Bit-Flip Code")
 
@@ -94,7 +93,11 @@ Try different error rates $p$:
 This mirrors the trade-off you saw in the Repetition code — but now using the true quantum language of **stabilizers and syndromes**.
 """)
 
-code = ThreeQubitBitFlip()
+code = three_qubit_code()
+# same batched syndrome/correction kernel as the repetition page, at n = 3
+rep = repetition_code(3)
+# one-shot draws are tiny; serve them from a buffered pool kept across reruns
+pool = st.session_state.setdefault("bitflip_pool", RandomPool())
 
 left, right = st.columns([1, 2], vertical_alignment="top")
 
@@ -110,12 +113,13 @@ with left:
             forced[int(q) - 1] = 1
             e = forced
         else:
-            e = bsc_flip_mask(3, p)
+            e = bsc_flip_mask(3, p, rng=pool)
     else:
-        e = bsc_flip_mask(3, p)
+        e = bsc_flip_mask(3, p, rng=pool)
 
     if st.button("Run one shot"):
-        syn, corr = lookup_decoder_3q(code, e)
+        syns, corrs = rep.decode(e[None, :])
+        syn, corr = syns[0], corrs[0]
         post = (e + corr) % 2
         decoded_bit = code.decode_majority(post)
         st.session_state["bitflip_last"] = dict(
@@ -135,7 +139,7 @@ with left:
         st.dataframe(df, width="stretch")
 
     if st.button("Estimate logical error rate"):
-        rate = bitflip_mc_error(p, trials)
+        rate = repetition_mc_error(3, p, trials)
         st.session_state["bitflip_rate"] = rate
         st.metric("Estimated logical error", f"{rate:.4f}")
 
@@ -3,7 +3,11 @@ import numpy as np
 import pandas as pd
 import streamlit as st
 
-from qec.analytics import phaseflip_mc_error, phaseflip_mixed_counts
+from qec.analytics import (
+    phaseflip_mc_error,
+    phaseflip_mixed_counts,
+    three_qubit_mc_error,
+)
 from qec.challenges import Challenge, check_threshold
 from qec.circuits import draw_circuit
 from qec.codes import ThreeQubitBitFlip
@@ -132,3 +136,38 @@ with col_notes:
         - This is exactly why the $H$-sandwich detects phase flips.
     """
     )
+
+st.divider()
+st.subheader("Activity: Logical phase-flip rate of the 3-qubit code")
+st.caption(
+    r"Encode in $\ket{+++}/\ket{---}$, apply $Z$ on each qubit with probability $p$, "
+    r"decode with the $X_1X_2$, $X_2X_3$ syndrome, and count logical phase flips."
+)
+
+with st.form(key="phase_mc_form", clear_on_submit=False):
+    p_mc = st.slider(r"Phase-flip probability $p$", 0.0, 0.5, 0.10, 0.01, key="ph_p")
+    trials_mc = st.select_slider(
+        "Monte-Carlo trials",
+        options=[10_000, 100_000, 1_000_000, 10_000_000],
+        value=1_000_000,
+        key="ph_trials",
+    )
+    basis_mc = st.radio(
+        "Error channel",
+        ["Z only", "X and Z (each decoded by its own 3-qubit code)"],
+        horizontal=True,
+        key="ph_basis",
+    )
+    submitted_mc = st.form_submit_button("Estimate logical error rate")
+
+if submitted_mc:
+    if basis_mc == "Z only":
+        rate_mc = phaseflip_mc_error(float(p_mc), int(trials_mc))
+    else:
+        rate_mc = three_qubit_mc_error(float(p_mc), int(trials_mc), basis="XZ")
+    st.session_state["phase_rate"] = rate_mc
+    st.metric("Estimated logical error", f"{rate_mc:.5f}")
+    st.caption(
+        "With only $Z$ errors the phase-flip code behaves exactly like the bit-flip code. "
+        "With both error types a failure in either sector counts, so the rate roughly doubles."
+    )
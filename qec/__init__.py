@@ -1,8 +1,90 @@
 """QEC Mini-Lab core package."""
 
-from .analytics import bitflip_mc_error, phaseflip_mc_error, repetition_mc_error
+from . import gf2
+from .analytics import (
+    bitflip_mc_error,
+    css_failures,
+    css_mc_error,
+    lookup_logical_exact,
+    lookup_pattern_failures,
+    phaseflip_mc_error,
+    repetition_erasure_mc_error,
+    repetition_failures,
+    repetition_logical_exact,
+    repetition_mc_error,
+    repetition_rare_error,
+    three_qubit_erasure_mc_error,
+    three_qubit_failures,
+    three_qubit_mc_error,
+    three_qubit_rare_error,
+)
 from .challenges import Challenge, check_smallest_n_below, check_threshold
-from .codes import ParityCheck, ThreeQubitBitFlip
-from .decoders import lookup_decoder_3q
-from .error_models import bsc_flip_mask
+from .codes import (
+    ParityCheck,
+    RepetitionCode,
+    SparseParityCheck,
+    SyndromeTable,
+    ThreeQubitBitFlip,
+    load_syndrome_table,
+    pack_errors,
+    repetition_code,
+    syndrome_table,
+    three_qubit_code,
+)
+from .css import (
+    CSSCode,
+    rotated_surface_code,
+    shor_code,
+    steane_code,
+    toric_code,
+)
+from .decoders import (
+    erasure_lookup_table,
+    lookup_decoder_3q,
+    lookup_decoder_3q_batch,
+    lookup_decoder_3q_sparse,
+    lookup_decoder_erasure,
+    lookup_table,
+    majority_decode_erasure,
+    majority_decode_packed,
+    majority_decode_sparse,
+    union_find_decoder,
+)
+from .error_models import (
+    BSC,
+    BiasedXZ,
+    Depolarizing,
+    Erasure,
+    ErrorModel,
+    GilbertElliott,
+    RandomPool,
+    SparseFlips,
+    UniformSource,
+    all_error_patterns,
+    as_error_model,
+    bsc_flip_indices,
+    bsc_flip_mask,
+    bsc_flip_mask_chunks,
+    bsc_packed_mask,
+    chunk_sizes,
+    erasure_flip_mask,
+    pattern_counts,
+)
+from .estimation import (
+    MCResult,
+    adaptive_mc,
+    clopper_pearson_interval,
+    importance_sample,
+    stratified_sample,
+    weight_patterns,
+    wilson_interval,
+)
+from .rng import (
+    StreamKey,
+    as_generator,
+    chunk_generators,
+    fresh_seed,
+    philox_stream,
+)
 from .stabilizers import PauliLengthError, pauli_commutes, syndrome_from_pauli
+from .sweep import SweepPoint, crn_repetition_sweep, run_sweep, sweep_grid
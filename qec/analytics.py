@@ -1,54 +1,447 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 import numpy as np
 from qiskit import transpile
 from qiskit.quantum_info import Statevector
+from scipy.special import gammaln, logsumexp, xlog1py, xlogy
 
 from .circuits import phase_demo_circuit
-from .codes import ThreeQubitBitFlip
-from .decoders import lookup_decoder_3q
-from .error_models import bsc_flip_mask
+from .codes import (
+    ParityCheck,
+    ThreeQubitBitFlip,
+    syndrome_table,
+    three_qubit_code,
+)
+from .css import CSSCode
+from .decoders import (
+    erasure_lookup_table,
+    lookup_decoder_3q_batch,
+    lookup_decoder_3q_sparse,
+    lookup_decoder_erasure,
+    lookup_table,
+    majority_decode_erasure,
+    majority_decode_packed,
+    majority_decode_sparse,
+)
+from .error_models import (
+    BiasedXZ,
+    ErrorModel,
+    SparseFlips,
+    all_error_patterns,
+    as_error_model,
+    bsc_flip_indices,
+    bsc_flip_mask,
+    bsc_packed_mask,
+    chunk_sizes,
+    erasure_flip_mask,
+    pattern_counts,
+)
+from .estimation import MCResult, importance_sample, stratified_sample
+from .rng import StreamKey, as_generator, chunk_generators
+
+# Target size of one packed chunk, in uint64 words (8 MB)
+_PACKED_CHUNK_WORDS = 1 << 20
+
+
+def _flip_probability(p: float | ErrorModel, method: str) -> float:
+    """Methods built on the BSC formula need a bare probability, not a model."""
+    if isinstance(p, (int, float, np.floating)):
+        return float(p)
+    raise ValueError(f"method={method!r} needs a flip probability, not {p!r}")
+
+
+def _rate(failures: int, trials: int) -> float:
+    """failures / trials, nan for zero trials (the mean of an empty sample)."""
+    return failures / trials if trials else float("nan")
+
+
+def repetition_failures(
+    n: int,
+    p: float | ErrorModel,
+    trials: int,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    method: str = "dense",
+    chunk_size: int | None = None,
+) -> int:
+    """
+    Number of logical failures of the length-n repetition code (majority vote)
+    in `trials` Monte-Carlo trials. Trials are streamed in chunks of
+    `chunk_size` (default: about 2**20 bits, or 8 MB packed) so peak memory
+    does not depend on `trials`.
+    p is a flip probability, or any ErrorModel (its X plane is used).
+    - method="dense": one uniform per bit, fine for small n; the only
+      method that takes an ErrorModel.
+    - method="packed": flip patterns stored as uint64 words (1 bit per bit),
+      majority by popcount, for large n.
+    - method="sparse": only flip positions are drawn (geometric gaps), for
+      small p where cost should follow the number of flips.
+    """
+    failures = 0
+    if method == "dense":
+        model = as_error_model(p)
+        for k, gen in chunk_generators(rng, chunk_sizes(trials, n, chunk_size)):
+            flips, _ = model.sample(k, n, gen)
+            # majority vote, ties count as successes (as in the other methods)
+            failures += int((np.count_nonzero(flips, axis=1) > n / 2).sum())
+        return failures
+    p = _flip_probability(p, method)
+    if method == "packed":
+        chunk = chunk_size or max(1, _PACKED_CHUNK_WORDS // -(-n // 64))
+        for k, gen in chunk_generators(rng, chunk_sizes(trials, n, chunk)):
+            words = bsc_packed_mask(n, p, k, rng=gen)
+            failures += int(majority_decode_packed(words, n).sum())
+        return failures
+    if method == "sparse":
+        # memory follows the flips, about n*p per trial plus the row pointer
+        sizes = chunk_sizes(trials, 1 + int(np.ceil(n * p)), chunk_size)
+        for k, gen in chunk_generators(rng, sizes):
+            flips = bsc_flip_indices(n, p, k, rng=gen)
+            failures += int(majority_decode_sparse(flips).sum())
+        return failures
+    raise ValueError(f"method must be 'dense', 'packed' or 'sparse' (got {method!r})")
 
 
 def repetition_mc_error(
-    n: int, p: float, trials: int = 10_000, rng: np.random.Generator | None = None
+    n: int,
+    p: float | ErrorModel,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    method: str = "dense",
+    chunk_size: int | None = None,
 ) -> float:
-    rng = rng or np.random.default_rng()
-    flips = (rng.random((trials, n)) < p).astype(int)
-    decoded = (flips.sum(axis=1) > n / 2).astype(int)
-    return float(decoded.mean())
+    """
+    Monte-Carlo logical error rate of the length-n repetition code
+    (see repetition_failures).
+    """
+    failures = repetition_failures(
+        n, p, trials, rng, method=method, chunk_size=chunk_size
+    )
+    return _rate(failures, trials)
+
+
+def _lookup_failures_3q(code: ThreeQubitBitFlip, e: np.ndarray) -> np.ndarray:
+    """Batched decode of (k, 3) error masks; True where the logical bit flipped."""
+    _, corr = lookup_decoder_3q_batch(code, e)
+    return code.decode_majority_batch(e ^ corr).astype(bool)
+
+
+def _lookup_failures_3q_sparse(
+    code: ThreeQubitBitFlip, flips: SparseFlips
+) -> np.ndarray:
+    """_lookup_failures_3q on sparse flips: weight of e ^ corr without densifying e."""
+    _, corr = lookup_decoder_3q_sparse(code, flips)
+    trial = flips.trial_ids()
+    overlap = np.bincount(
+        trial, weights=corr[trial, flips.indices], minlength=flips.size
+    )
+    residual = flips.weights() + np.count_nonzero(corr, axis=1) - 2 * overlap
+    return residual > 1
+
+
+def three_qubit_failures(
+    p: float | ErrorModel,
+    trials: int,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    basis: str = "X",
+    chunk_size: int | None = None,
+    method: str = "dense",
+) -> int:
+    """
+    Number of logical failures of the 3-qubit code in `trials` trials,
+    streamed in (chunk_size, 3) blocks.
+    - basis="X": bit flips, checked by Z1Z2, Z2Z3.
+    - basis="Z": phase flips, checked by X1X2, X2X3 (H-sandwich of the X case).
+    - basis="XZ": independent X and Z flips with prob p each; a trial fails
+      if either sector fails.
+    Both sectors share the same lookup kernel. If p is an ErrorModel, one
+    (x, z) sample is drawn per chunk and `basis` picks the planes decoded, so
+    correlated noise (e.g. Depolarizing) reaches both sectors together.
+    method="dense" (the default, and the only one for models) draws one
+    uniform per bit, as in repetition_failures. method="multinomial" instead
+    draws how many trials hit each of the 2**(3 * sectors) patterns and
+    decodes each pattern once (cost independent of trials; chunk_size is
+    ignored). method="sparse" draws only the flip positions and decodes them
+    without building dense masks.
+    """
+    if basis not in ("X", "Z", "XZ"):
+        raise ValueError(f"basis must be 'X', 'Z' or 'XZ' (got {basis!r})")
+    code = three_qubit_code()
+    sizes = chunk_sizes(trials, 3 * len(basis), chunk_size)
+    if not isinstance(p, (int, float, np.floating)):
+        if method != "dense":
+            raise ValueError(f"method={method!r} needs a flip probability, not {p!r}")
+        failures = 0
+        for k, gen in chunk_generators(rng, sizes):
+            x, z = p.sample(k, 3, gen)
+            failed = np.zeros(k, dtype=bool)
+            for plane in basis:
+                failed |= _lookup_failures_3q(code, x if plane == "X" else z)
+            failures += int(failed.sum())
+        return failures
+    if method == "multinomial":
+        patterns = all_error_patterns(3 * len(basis))
+        failed = np.zeros(len(patterns), dtype=bool)
+        for i in range(len(basis)):
+            failed |= _lookup_failures_3q(code, patterns[:, 3 * i : 3 * i + 3])
+        counts = pattern_counts(3 * len(basis), p, trials, rng=as_generator(rng))
+        return int(counts[failed].sum())
+    if method not in ("dense", "sparse"):
+        raise ValueError(
+            f"method must be 'dense', 'multinomial' or 'sparse' (got {method!r})"
+        )
+    failures = 0
+    for k, gen in chunk_generators(rng, sizes):
+        failed = np.zeros(k, dtype=bool)
+        for _ in basis:
+            if method == "sparse":
+                flips = bsc_flip_indices(3, p, k, rng=gen)
+                failed |= _lookup_failures_3q_sparse(code, flips)
+            else:
+                e = bsc_flip_mask(3, p, size=k, rng=gen)
+                failed |= _lookup_failures_3q(code, e)
+        failures += int(failed.sum())
+    return failures
+
+
+def three_qubit_mc_error(
+    p: float | ErrorModel,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    basis: str = "X",
+    chunk_size: int | None = None,
+    method: str = "dense",
+) -> float:
+    """Monte-Carlo logical error rate of the 3-qubit code (see three_qubit_failures)."""
+    failures = three_qubit_failures(
+        p, trials, rng, basis=basis, chunk_size=chunk_size, method=method
+    )
+    return _rate(failures, trials)
 
 
 def bitflip_mc_error(
-    p: float, trials: int = 10_000, rng: np.random.Generator | None = None
+    p: float | ErrorModel,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
 ) -> float:
-    rng = rng or np.random.default_rng()
-    code = ThreeQubitBitFlip()
-    errs = 0
-    for _ in range(trials):
-        e = bsc_flip_mask(3, p, rng=rng)
-        syn, corr = lookup_decoder_3q(code, e)
-        post = (e + corr) % 2
-        errs += int(code.decode_majority(post) == 1)
-    return errs / trials
+    """Monte-Carlo logical error rate of the 3-qubit code under X flips."""
+    return three_qubit_mc_error(p, trials, rng, basis="X")
 
 
 def phaseflip_mc_error(
-    p: float, trials: int = 10_000, rng: np.random.Generator | None = None
+    p: float | ErrorModel,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
 ) -> float:
     """
     Same parity logic but treating Z-errors (H-basis argument).
     Logical phase error if majority(Z) after correction.
     """
-    rng = rng or np.random.default_rng()
-    code = ThreeQubitBitFlip()
-    errs = 0
-    for _ in range(trials):
-        eZ = bsc_flip_mask(3, p, rng=rng)  # which qubits suffered Z
-        syn, corrZ = lookup_decoder_3q(code, eZ)
-        post = (eZ + corrZ) % 2
-        errs += int(post.sum() > 1)
-    return errs / trials
+    return three_qubit_mc_error(p, trials, rng, basis="Z")
+
+
+def css_failures(
+    code: CSSCode,
+    p: float | ErrorModel,
+    trials: int,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    chunk_size: int | None = None,
+    method: str = "auto",
+) -> int:
+    """
+    Number of logical failures of a CSS code (e.g. css.steane_code() or
+    css.rotated_surface_code(d)) in `trials` trials, both sectors decoded as
+    in CSSCode.decode: lookup tables for small codes, union-find for larger
+    surface and toric codes. p is the flip probability of independent X and Z
+    errors (BiasedXZ(p, p)), or any ErrorModel, e.g. Depolarizing(p).
+    """
+    model = BiasedXZ(p, p) if isinstance(p, (int, float, np.floating)) else p
+    failures = 0
+    for k, gen in chunk_generators(rng, chunk_sizes(trials, 2 * code.n, chunk_size)):
+        x, z = model.sample(k, code.n, gen)
+        failures += int(code.logical_failures(x, z, method=method).sum())
+    return failures
+
+
+def css_mc_error(
+    code: CSSCode,
+    p: float | ErrorModel,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    chunk_size: int | None = None,
+    method: str = "auto",
+) -> float:
+    """Monte-Carlo logical error rate of a CSS code (see css_failures)."""
+    failures = css_failures(code, p, trials, rng, chunk_size=chunk_size, method=method)
+    return _rate(failures, trials)
+
+
+def repetition_erasure_mc_error(
+    n: int,
+    p_erase: float,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    p_flip: float = 0.0,
+    chunk_size: int | None = None,
+) -> float:
+    """
+    Logical error rate of the repetition code on a mixed erasure + flip channel
+    (erasure_flip_mask), decoded by majority over the non-erased bits.
+    """
+    failures = 0
+    for k, gen in chunk_generators(rng, chunk_sizes(trials, n, chunk_size)):
+        erased, flips = erasure_flip_mask(n, p_erase, p_flip, size=k, rng=gen)
+        failures += int(majority_decode_erasure(flips, erased, rng=gen).sum())
+    return _rate(failures, trials)
+
+
+def three_qubit_erasure_mc_error(
+    p_erase: float,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    p_flip: float = 0.0,
+    chunk_size: int | None = None,
+) -> float:
+    """
+    Logical error rate of the 3-qubit code on a mixed erasure + flip channel,
+    decoded by the erasure-aware lookup table (one sector; X and Z alike).
+    """
+    checks = three_qubit_code().checks
+    table = erasure_lookup_table(checks)
+    failures = 0
+    for k, gen in chunk_generators(rng, chunk_sizes(trials, 3, chunk_size)):
+        erased, e = erasure_flip_mask(3, p_erase, p_flip, size=k, rng=gen)
+        _, corr = lookup_decoder_erasure(checks, e, erased, table)
+        failures += int((e ^ corr).any(axis=1).sum())
+    return _rate(failures, trials)
+
+
+def repetition_logical_exact(n, p):
+    """
+    Exact logical error rate of the length-n repetition code,
+    P = sum_{k > n/2} C(n, k) p^k (1-p)^(n-k), evaluated in log space.
+    n and p broadcast against each other; scalars in give a float out.
+    """
+    n_arr, p_arr = np.broadcast_arrays(
+        np.asarray(n, dtype=np.int64), np.asarray(p, dtype=float)
+    )
+    k = np.arange(int(n_arr.max(initial=0)) + 1)
+    nn, pp = n_arr[..., None], p_arr[..., None]
+    log_terms = (
+        gammaln(nn + 1)
+        - gammaln(k + 1)
+        - gammaln(np.maximum(nn - k, 0) + 1)
+        + xlogy(k, pp)
+        + xlog1py(nn - k, -pp)
+    )
+    in_tail = (k > nn // 2) & (k <= nn)
+    log_terms = np.where(in_tail, log_terms, -np.inf)
+    out = np.exp(logsumexp(log_terms, axis=-1))
+    return float(out) if out.ndim == 0 else out
+
+
+@lru_cache(maxsize=32)
+def _lookup_failed_patterns(checks: ParityCheck) -> tuple[np.ndarray, np.ndarray]:
+    """
+    All 2**n error patterns and whether the lookup decoder fails on each.
+    Cached per code, so both arrays are read-only.
+    """
+    patterns = all_error_patterns(checks.S.shape[1])
+    table = lookup_table(checks)
+    syn_idx = syndrome_table(checks).table
+    failed = (patterns ^ table[syn_idx]).any(axis=1)
+    patterns.flags.writeable = False
+    failed.flags.writeable = False
+    return patterns, failed
+
+
+def lookup_logical_exact(checks: ParityCheck, p):
+    """
+    Exact logical error rate of a small code under i.i.d. flips with prob p,
+    decoded by its minimum-weight lookup table (decoders.lookup_table).
+    All 2**n error patterns are decoded once; a pattern fails if the residual
+    e + correction is a nonzero codeword. p may be a scalar or an array.
+    """
+    n = checks.S.shape[1]
+    patterns, failed = _lookup_failed_patterns(checks)
+    # number of failing patterns of each weight w = 0..n
+    fail_by_weight = np.bincount(
+        np.count_nonzero(patterns[failed], axis=1), minlength=n + 1
+    )
+    w = np.arange(n + 1)
+    pp = np.asarray(p, dtype=float)[..., None]
+    out = (fail_by_weight * pp**w * (1 - pp) ** (n - w)).sum(axis=-1)
+    return float(out) if out.ndim == 0 else out
+
+
+def lookup_pattern_failures(
+    checks: ParityCheck,
+    p: float,
+    trials: int,
+    rng: np.random.Generator | StreamKey | None = None,
+) -> int:
+    """
+    Monte-Carlo failure count of a small lookup-decoded code via pattern counts:
+    one multinomial draw gives how many of the `trials` hit each of the 2**n
+    error patterns, and each pattern is decoded once. O(2**n) for any `trials`.
+    """
+    _, failed = _lookup_failed_patterns(checks)
+    counts = pattern_counts(checks.S.shape[1], p, trials, rng=as_generator(rng))
+    return int(counts[failed].sum())
+
+
+def _rare_event(fails, n: int, p: float, trials: int, rng, method: str, q):
+    if method == "importance":
+        return importance_sample(fails, n, p, trials, q=q, rng=as_generator(rng))
+    if method == "stratified":
+        return stratified_sample(fails, n, p, trials, rng=as_generator(rng))
+    raise ValueError(f"method must be 'importance' or 'stratified' (got {method!r})")
+
+
+def repetition_rare_error(
+    n: int,
+    p: float,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    method: str = "importance",
+    q: float | None = None,
+) -> MCResult:
+    """
+    Low-p logical error rate of the repetition code with a variance report.
+    method="importance" samples flips at the tilted rate q and reweights;
+    method="stratified" samples each error weight class separately.
+    """
+    return _rare_event(
+        lambda e: np.count_nonzero(e, axis=1) > n / 2, n, p, trials, rng, method, q
+    )
+
+
+def three_qubit_rare_error(
+    p: float,
+    trials: int = 10_000,
+    rng: np.random.Generator | StreamKey | None = None,
+    *,
+    method: str = "importance",
+    q: float | None = None,
+) -> MCResult:
+    """
+    Low-p logical error rate of the 3-qubit code (X or Z sector alike),
+    see repetition_rare_error.
+    """
+    code = three_qubit_code()
+    return _rare_event(
+        lambda e: _lookup_failures_3q(code, e), 3, p, trials, rng, method, q
+    )
 
 
 try:
@@ -70,19 +463,26 @@ def _counts_from_statevector(qc) -> dict[str, float]:
     return {"0": p0, "1": 1.0 - p0}
 
 
-def _sample_counts(probs: dict[str, float], shots: int) -> dict[str, int]:
+def _sample_counts(
+    probs: dict[str, float], shots: int, rng: np.random.Generator
+) -> dict[str, int]:
     if shots <= 0:
         return {"0": 0, "1": 0}
-    outcomes = np.random.choice(["0", "1"], size=shots, p=[probs["0"], probs["1"]])
-    return {"0": int((outcomes == "0").sum()), "1": int((outcomes == "1").sum())}
+    ones = int(rng.binomial(shots, probs["1"]))
+    return {"0": shots - ones, "1": ones}
 
 
 def phaseflip_mixed_counts(
-    p: float, shots: int, *, measure_x_basis: bool
+    p: float,
+    shots: int,
+    *,
+    measure_x_basis: bool,
+    rng: np.random.Generator | StreamKey | None = None,
 ) -> tuple[dict[str, int], object, object]:
     """
     Emulate a Z error with probability p on |+>, measured either in Z or X basis.
-    Returns (combined_counts, qc_I, qc_Z).
+    Returns (combined_counts, qc_I, qc_Z). rng only drives the statevector
+    fallback; Aer draws its own shots.
     """
     shots_z = int(round(p * shots))
     shots_i = shots - shots_z
@@ -99,8 +499,9 @@ def phaseflip_mixed_counts(
     else:
         probs_I = _counts_from_statevector(qc_I)
         probs_Z = _counts_from_statevector(qc_Z)
-        cI = _sample_counts(probs_I, shots_i)
-        cZ = _sample_counts(probs_Z, shots_z)
+        gen = as_generator(rng)
+        cI = _sample_counts(probs_I, shots_i, gen)
+        cZ = _sample_counts(probs_Z, shots_z, gen)
 
     counts = {
         "0": cI.get("0", 0) + cZ.get("0", 0),
@@ -1,20 +1,268 @@
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from typing import Sequence
 
 import numpy as np
 
+from . import gf2
+from .error_models import SparseFlips
 
-@dataclass(frozen=True)
+
+def _frozen(a, dtype) -> np.ndarray:
+    """Read-only copy, so a code's content (and hence its hash) cannot change."""
+    out = np.array(a, dtype=dtype)
+    out.flags.writeable = False
+    return out
+
+
+def _digest(*arrays: np.ndarray) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for a in arrays:
+        h.update(np.asarray(a.shape, dtype=np.int64).tobytes())
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()
+
+
+@dataclass(frozen=True, eq=False)
 class ParityCheck:
-    """Binary parity-check matrix S (rows = checks, cols = qubits), over GF(2)."""
+    """
+    Binary parity-check matrix S (rows = checks, cols = qubits), over GF(2).
+    Hashable by content (see digest), so it can key caches of derived data.
+    """
+
+    S: np.ndarray  # shape (m, n), stored as read-only uint8
+
+    def __post_init__(self):
+        object.__setattr__(self, "S", _frozen(self.S, np.uint8))
+
+    @cached_property
+    def digest(self) -> str:
+        """Stable content hash: shape plus the row-packed bits of S."""
+        return _digest(np.asarray(self.S.shape), np.packbits(self.S & 1, axis=1))
 
-    S: np.ndarray  # shape (m, n), dtype=int
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ParityCheck):
+            return NotImplemented
+        return self.S.shape == other.S.shape and self.digest == other.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
 
     def syndrome(self, e_bits: np.ndarray) -> np.ndarray:
-        """Compute syndrome s = S e (mod 2)."""
-        return (self.S @ e_bits) % 2
+        """Compute syndrome s = S e (mod 2) as uint8 (int input is accepted)."""
+        # uint8 sums wrap mod 256, which keeps the parity
+        return (self.S @ np.asarray(e_bits, dtype=np.uint8)) & 1
+
+    def syndromes(self, E: np.ndarray, *, packed: bool = False) -> np.ndarray:
+        """
+        Batched syndromes of a (k, n) 0/1 error array: (k, m) uint8, or with
+        packed=True the (k,) int64 table indices sum_i s_i * 2**i (m <= 63).
+        """
+        E = np.asarray(E, dtype=np.uint8)
+        if not packed:
+            return (E @ self.S.T) & 1
+        m = self.S.shape[0]
+        if m > 63:
+            raise ValueError(f"packed syndromes need at most 63 checks (got {m})")
+        # column c toggles the checks in its packed mask; XOR the masks of the
+        # flipped columns instead of packing a (k, m) matmul result
+        masks = (self.S.astype(np.int64) << np.arange(m)[:, None]).sum(axis=0)
+        idx = np.zeros(E.shape[0], dtype=np.int64)
+        for c in np.flatnonzero(masks):
+            idx ^= E[:, c] * masks[c]
+        return idx
+
+    def syndromes_sparse(self, flips: SparseFlips) -> np.ndarray:
+        """(size, m) uint8 syndromes computed directly from sparse flip positions."""
+        trial = flips.trial_ids()
+        syn = np.empty((flips.size, self.S.shape[0]), dtype=np.uint8)
+        for i, row in enumerate(self.S):
+            hits = np.bincount(trial, weights=row[flips.indices], minlength=flips.size)
+            syn[:, i] = hits.astype(np.int64) & 1
+        return syn
+
+    @property
+    def rank(self) -> int:
+        """Number of independent checks (GF(2) rank of S)."""
+        return gf2.rank(self.S)
+
+    def logicals(self) -> np.ndarray:
+        """
+        Basis of the codewords (S x = 0), i.e. the logical operators of the
+        classical code, as an (n - rank, n) uint8 array.
+        """
+        return gf2.nullspace(self.S)
+
+    def to_sparse(self) -> SparseParityCheck:
+        """The same checks as a SparseParityCheck (CSR check -> qubit lists)."""
+        rows, cols = np.nonzero(self.S & 1)
+        indptr = np.zeros(self.S.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=self.S.shape[0]), out=indptr[1:])
+        return SparseParityCheck(indptr, cols.astype(np.int64), self.S.shape[1])
+
+
+@dataclass(frozen=True, eq=False)
+class SparseParityCheck:
+    """
+    Parity checks of a large code in CSR form: check i acts on qubits
+    indices[indptr[i]:indptr[i + 1]] (increasing order). Memory is
+    O(nnz + m), independent of the number of qubits n. Hashable by content.
+    """
+
+    indptr: np.ndarray  # (m + 1,) int64, read-only
+    indices: np.ndarray  # (nnz,) int64, read-only
+    n: int
+
+    def __post_init__(self):
+        object.__setattr__(self, "indptr", _frozen(self.indptr, np.int64))
+        object.__setattr__(self, "indices", _frozen(self.indices, np.int64))
+
+    @cached_property
+    def digest(self) -> str:
+        """Stable content hash of (indptr, indices, n)."""
+        return _digest(self.indptr, self.indices, np.asarray(self.n))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SparseParityCheck):
+            return NotImplemented
+        return self.shape == other.shape and self.digest == other.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.indptr) - 1, self.n
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    def to_dense(self) -> ParityCheck:
+        """The same checks as a dense ParityCheck."""
+        m = self.shape[0]
+        S = np.zeros((m, self.n), dtype=np.uint8)
+        S[np.repeat(np.arange(m), np.diff(self.indptr)), self.indices] = 1
+        return ParityCheck(S)
+
+    @property
+    def rank(self) -> int:
+        return self.to_dense().rank
+
+    def logicals(self) -> np.ndarray:
+        """Codeword basis, as in ParityCheck.logicals."""
+        return self.to_dense().logicals()
+
+    def _row_parities(self, gathered: np.ndarray) -> np.ndarray:
+        # parity of each CSR row of `gathered` (last axis = nnz) via a running XOR;
+        # differencing the prefix at the row bounds also handles empty checks
+        prefix = np.zeros(gathered.shape[:-1] + (self.nnz + 1,), dtype=np.uint8)
+        np.bitwise_xor.accumulate(gathered, axis=-1, out=prefix[..., 1:])
+        return prefix[..., self.indptr[1:]] ^ prefix[..., self.indptr[:-1]]
+
+    def syndrome(self, e_bits: np.ndarray) -> np.ndarray:
+        """Syndrome s = S e (mod 2) of one length-n 0/1 vector, as uint8."""
+        return self._row_parities(np.asarray(e_bits, dtype=np.uint8)[self.indices])
+
+    def syndromes(self, E: np.ndarray, *, packed: bool = False) -> np.ndarray:
+        """
+        Batched syndromes of a (k, n) 0/1 error array, touching only the
+        nonzeros: (k, m) uint8, or with packed=True the (k,) int64 indices
+        sum_i s_i * 2**i (m <= 63), as in ParityCheck.syndromes.
+        """
+        syn = self._row_parities(np.asarray(E, dtype=np.uint8)[:, self.indices])
+        if not packed:
+            return syn
+        m = self.shape[0]
+        if m > 63:
+            raise ValueError(f"packed syndromes need at most 63 checks (got {m})")
+        return syn @ (np.int64(1) << np.arange(m, dtype=np.int64))
+
+    def check_hits(self, flips: SparseFlips) -> np.ndarray:
+        """
+        trial * m + check for every (flip, check on the flipped qubit) pair,
+        O(flips * column weight); a check fires when it is hit an odd number of times.
+        """
+        m = self.shape[0]
+        # transpose to qubit -> checks lists so each flip finds the checks it toggles
+        order = np.argsort(self.indices, kind="stable")
+        col_ptr = np.zeros(self.n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.n), out=col_ptr[1:])
+        check_of = np.repeat(np.arange(m), np.diff(self.indptr))[order]
+        start = col_ptr[flips.indices]
+        count = col_ptr[flips.indices + 1] - start
+        first = np.cumsum(count) - count  # where each flip's run begins in pos
+        pos = np.arange(count.sum()) + np.repeat(start - first, count)
+        return np.repeat(flips.trial_ids() * m, count) + check_of[pos]
+
+    def syndromes_sparse(self, flips: SparseFlips) -> np.ndarray:
+        """(size, m) uint8 syndromes from sparse flip positions (see check_hits)."""
+        m = self.shape[0]
+        hits = np.bincount(self.check_hits(flips), minlength=flips.size * m)
+        return (hits & 1).astype(np.uint8).reshape(flips.size, m)
+
+
+@dataclass(frozen=True)
+class RepetitionCode:
+    """
+    Length-n repetition code (0_L = 0...0, 1_L = 1...1) with the n - 1
+    nearest-neighbour checks Z_i Z_{i+1}, decoded by minimum weight (majority).
+    """
+
+    n: int
+
+    @cached_property
+    def checks(self) -> SparseParityCheck:
+        """Check i acts on qubits (i, i + 1); built on first use."""
+        m = max(self.n - 1, 0)
+        indices = np.stack([np.arange(m), np.arange(1, m + 1)], axis=1)
+        return SparseParityCheck(np.arange(0, 2 * m + 1, 2), indices.ravel(), self.n)
+
+    @property
+    def distance(self) -> int:
+        return self.n
+
+    def syndromes(self, E: np.ndarray, *, packed: bool = False) -> np.ndarray:
+        """
+        (k, n - 1) uint8 syndromes s_i = e_i ^ e_{i+1} of a (k, n) error
+        array, or packed table indices as in ParityCheck.syndromes.
+        """
+        E = np.asarray(E, dtype=np.uint8)
+        if packed:
+            return self.checks.syndromes(E, packed=True)
+        return E[:, :-1] ^ E[:, 1:]
+
+    def corrections(self, syn: np.ndarray) -> np.ndarray:
+        """
+        (k, n) uint8 minimum-weight corrections for (k, n - 1) syndromes.
+        The prefix XOR of the syndrome is the error with e_0 = 0 that explains
+        it; the only other one is its complement, used when it is lighter.
+        Ties (even n) keep e_0 = 0.
+        """
+        syn = np.asarray(syn, dtype=np.uint8)
+        corr = np.zeros((syn.shape[0], self.n), dtype=np.uint8)
+        np.bitwise_xor.accumulate(syn, axis=1, out=corr[:, 1:])
+        corr[np.count_nonzero(corr, axis=1) > self.n / 2] ^= 1
+        return corr
+
+    def decode(self, E: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Batched (syndromes, corrections) for a (k, n) error array."""
+        syn = self.syndromes(E)
+        return syn, self.corrections(syn)
+
+    def logical_failures(self, E: np.ndarray) -> np.ndarray:
+        """
+        (k,) bool, True where decoding leaves a logical flip. The residual
+        e ^ correction is 0...0 or 1...1; it is 1...1 when more than n/2 bits
+        flipped, or (even n) exactly n/2 flipped with e_0 = 1, since ties keep
+        the e_0 = 0 explanation. So this is one weight count per row.
+        """
+        E = np.asarray(E, dtype=np.uint8)
+        w = np.count_nonzero(E, axis=1)
+        return (w > self.n / 2) | ((2 * w == self.n) & (E[:, 0] == 1))
 
 
 @dataclass(frozen=True)
@@ -24,7 +272,9 @@ class ThreeQubitBitFlip:
     Logical 0_L=000, 1_L=111. Checks: Z1Z2, Z2Z3 -> parity on (1,2) and (2,3).
     """
 
-    checks: ParityCheck = ParityCheck(S=np.array([[1, 1, 0], [0, 1, 1]], dtype=int))
+    checks: ParityCheck = ParityCheck(
+        S=np.array([[1, 1, 0], [0, 1, 1]], dtype=np.uint8)
+    )
 
     @property
     def distance(self) -> int:
@@ -34,5 +284,129 @@ class ThreeQubitBitFlip:
         """Return decoded bit after majority vote; 1 indicates logical flip if we sent 0."""
         return int(word_bits.sum() > 1)
 
+    def decode_majority_batch(self, words: np.ndarray) -> np.ndarray:
+        """Majority vote on each row of a (k, 3) array of words (uint8 0/1)."""
+        return (np.count_nonzero(words, axis=1) > 1).astype(np.uint8)
+
     def syndrome(self, e_bits: np.ndarray) -> np.ndarray:
         return self.checks.syndrome(e_bits)
+
+
+@lru_cache(maxsize=None)
+def repetition_code(n: int) -> RepetitionCode:
+    """Shared RepetitionCode(n), so its checks and tables are built once per n."""
+    return RepetitionCode(n)
+
+
+@lru_cache(maxsize=None)
+def three_qubit_code() -> ThreeQubitBitFlip:
+    """Shared ThreeQubitBitFlip instance."""
+    return ThreeQubitBitFlip()
+
+
+# Largest code a SyndromeTable is built for: 2**30 entries is already 1-4 GB
+MAX_TABLE_QUBITS = 30
+
+
+def _as_parity_check(code) -> ParityCheck:
+    """The dense checks of a ParityCheck, SparseParityCheck or code object."""
+    checks = getattr(code, "checks", code)
+    if isinstance(checks, SparseParityCheck):
+        checks = checks.to_dense()
+    if not isinstance(checks, ParityCheck):
+        raise TypeError(f"expected a ParityCheck or a code with .checks (got {code!r})")
+    return checks
+
+
+def _column_masks(checks: ParityCheck) -> np.ndarray:
+    """(n,) uint64: bit i of entry j is set when check i acts on qubit j."""
+    shifts = np.arange(checks.S.shape[0], dtype=np.uint64)[:, None]
+    return (checks.S.astype(np.uint64) << shifts).sum(axis=0, dtype=np.uint64)
+
+
+def pack_errors(E: np.ndarray) -> np.ndarray:
+    """(k, n) 0/1 errors (n <= 32) -> (k,) uint32 indices sum_j e_j * 2**j."""
+    E = np.atleast_2d(np.asarray(E, dtype=np.uint8))
+    if E.shape[1] > 32:
+        raise ValueError(f"can only pack up to 32 bits per error (got {E.shape[1]})")
+    packed = np.packbits(E, axis=1, bitorder="little")
+    out = np.zeros((E.shape[0], 4), dtype=np.uint8)
+    out[:, : packed.shape[1]] = packed
+    return out.view("<u4")[:, 0]
+
+
+@dataclass(frozen=True, eq=False)
+class SyndromeTable:
+    """
+    Packed syndrome of every error pattern of a small code: table[x] is the
+    index sum_i s_i * 2**i of the syndrome of the error with bits x (bit j =
+    qubit j), stored in the smallest unsigned type that holds m bits.
+    Batched syndromes are then a single gather.
+    """
+
+    table: np.ndarray  # (2**n,) uint8 / uint16 / uint32 / uint64, maybe memory-mapped
+    checks: ParityCheck
+
+    def syndromes(self, E: np.ndarray, *, packed: bool = False) -> np.ndarray:
+        """Same result as ParityCheck.syndromes (packed indices keep the table dtype)."""
+        return self.lookup(pack_errors(E), packed=packed)
+
+    def lookup(self, idx: np.ndarray, *, packed: bool = True) -> np.ndarray:
+        """Syndromes of errors given as packed indices (see pack_errors)."""
+        syn = self.table[idx]
+        if packed:
+            return syn
+        m = self.checks.S.shape[0]
+        shifts = np.arange(m, dtype=syn.dtype)
+        return ((syn[:, None] >> shifts) & 1).astype(np.uint8)
+
+    def save(self, path) -> None:
+        """Write the table as a .npy file (reload with load_syndrome_table)."""
+        np.save(path, np.asarray(self.table))
+
+
+@lru_cache(maxsize=16)
+def _build_syndrome_table(checks: ParityCheck) -> SyndromeTable:
+    m, n = checks.S.shape
+    if n > MAX_TABLE_QUBITS:
+        raise ValueError(f"syndrome tables need n <= {MAX_TABLE_QUBITS} (got {n})")
+    if m > 64:
+        raise ValueError(f"syndrome tables need at most 64 checks (got {m})")
+    dtype = next(
+        t
+        for t in (np.uint8, np.uint16, np.uint32, np.uint64)
+        if m <= 8 * np.dtype(t).itemsize
+    )
+    masks = _column_masks(checks)
+    # doubling: patterns with top bit j are the patterns below 2**j plus qubit j
+    table = np.zeros(1 << n, dtype=dtype)
+    for j in range(n):
+        half = 1 << j
+        np.bitwise_xor(table[:half], dtype(masks[j]), out=table[half : 2 * half])
+    table.flags.writeable = False
+    return SyndromeTable(table, checks)
+
+
+def syndrome_table(code) -> SyndromeTable:
+    """
+    SyndromeTable of a small code (a ParityCheck, SparseParityCheck,
+    ThreeQubitBitFlip, RepetitionCode, ...), built in O(2**n) and cached per code.
+    """
+    return _build_syndrome_table(_as_parity_check(code))
+
+
+def load_syndrome_table(path, code, *, mmap: bool = True) -> SyndromeTable:
+    """
+    Load a saved SyndromeTable for `code`, memory-mapped by default so only
+    the pages that are looked up are read. The single-qubit entries are
+    checked against the code's columns, to catch a table saved for another code.
+    """
+    checks = _as_parity_check(code)
+    n = checks.S.shape[1]
+    table = np.load(path, mmap_mode="r" if mmap else None)
+    if table.shape != (1 << n,):
+        raise ValueError(f"table has shape {table.shape}, expected ({1 << n},)")
+    units = table[1 << np.arange(n)].astype(np.uint64)
+    if not np.array_equal(units, _column_masks(checks)):
+        raise ValueError("table does not match the syndromes of this code")
+    return SyndromeTable(table, checks)
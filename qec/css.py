@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+from . import gf2
+from .codes import ParityCheck, SparseParityCheck, pack_errors, syndrome_table
+from .decoders import lookup_table, union_find_decoder
+from .error_models import SparseFlips, all_error_patterns
+
+# Table decoding enumerates all 2**n patterns per sector; larger codes fall
+# back to union-find (method="auto")
+MAX_DECODE_QUBITS = 20
+
+
+def _dense(checks) -> ParityCheck:
+    if isinstance(checks, SparseParityCheck):
+        return checks.to_dense()
+    return checks if isinstance(checks, ParityCheck) else ParityCheck(checks)
+
+
+def _quotient_basis(kernel_of: np.ndarray, modulo: np.ndarray) -> np.ndarray:
+    """Basis of ker(kernel_of) modulo the row space of `modulo` (a subspace of it)."""
+    N = gf2.nullspace(kernel_of)
+    R, pivots = gf2.row_reduce(modulo)
+    # v -> v + v[pivots] R is zero exactly on the row space of `modulo`
+    N ^= gf2.matmul(N[:, pivots], R)
+    return gf2.row_reduce(N)[0]
+
+
+def _odd_overlap(hx, hz) -> bool:
+    """Whether some X check and some Z check share an odd number of qubits."""
+    if isinstance(hx, SparseParityCheck) and isinstance(hz, SparseParityCheck):
+        # read each X check as a sparse "error" and count its hits per Z check;
+        # cost follows nnz, not mx * mz
+        rows = SparseFlips(hx.indptr, hx.indices, hx.n)
+        _, hits = np.unique(hz.check_hits(rows), return_counts=True)
+        return bool((hits & 1).any())
+    return bool(gf2.matmul(_dense(hx).S, _dense(hz).S.T).any())
+
+
+def _checks_shape(checks: ParityCheck | SparseParityCheck) -> tuple[int, int]:
+    return checks.shape if isinstance(checks, SparseParityCheck) else checks.S.shape
+
+
+@dataclass(frozen=True)
+class CSSCode:
+    """
+    CSS code from X-type checks hx and Z-type checks hz on the same n qubits.
+    Z checks flag X errors and X checks flag Z errors, so each error sector
+    is a classical decoding problem; hx hz^T = 0 (mod 2) makes the checks commute.
+    hx / hz may be ParityCheck, SparseParityCheck or 0/1 arrays.
+
+    Generated codes also carry closed-form logicals (lx, lz), used instead of
+    the GF(2) computation, and coordinates: qubit_coords (n, 2) and
+    check_coords (X-check (mx, 2), Z-check (mz, 2)) positions, for plotting.
+    """
+
+    hx: ParityCheck | SparseParityCheck
+    hz: ParityCheck | SparseParityCheck
+    logicals: tuple[np.ndarray, np.ndarray] | None = field(
+        default=None, compare=False, repr=False
+    )
+    qubit_coords: np.ndarray | None = field(default=None, compare=False, repr=False)
+    check_coords: tuple[np.ndarray, np.ndarray] | None = field(
+        default=None, compare=False, repr=False
+    )
+
+    def __post_init__(self):
+        for name in ("hx", "hz"):
+            checks = getattr(self, name)
+            if not isinstance(checks, (ParityCheck, SparseParityCheck)):
+                object.__setattr__(self, name, ParityCheck(checks))
+        nx, nz = _checks_shape(self.hx)[1], _checks_shape(self.hz)[1]
+        if nx != nz:
+            raise ValueError(f"hx and hz act on different qubit counts ({nx} vs {nz})")
+        if _odd_overlap(self.hx, self.hz):
+            raise ValueError(
+                "hx and hz are not orthogonal over GF(2): checks anticommute"
+            )
+        if self.logicals is not None:
+            lx, lz = (
+                np.atleast_2d(np.asarray(a, dtype=np.uint8)) for a in self.logicals
+            )
+            if self.hz.syndromes(lx).any() or self.hx.syndromes(lz).any():
+                raise ValueError(
+                    "logicals must commute with the checks of the other type"
+                )
+            if gf2.rank(gf2.matmul(lx, lz.T)) != len(lx) or len(lx) != len(lz):
+                raise ValueError("logicals must come in anticommuting X/Z pairs")
+            object.__setattr__(self, "logicals", (lx, lz))
+
+    @property
+    def n(self) -> int:
+        return _checks_shape(self.hx)[1]
+
+    @cached_property
+    def k(self) -> int:
+        """Number of logical qubits, n - rank(hx) - rank(hz)."""
+        if self.logicals is not None:
+            return len(self.logicals[0])
+        return self.n - self.hx.rank - self.hz.rank
+
+    @cached_property
+    def logical_x(self) -> np.ndarray:
+        """(k, n) X-type logicals: commute with the Z checks, not products of X checks."""
+        if self.logicals is not None:
+            return self.logicals[0]
+        return _quotient_basis(_dense(self.hz).S, _dense(self.hx).S)
+
+    @cached_property
+    def logical_z(self) -> np.ndarray:
+        """(k, n) Z-type logicals: commute with the X checks, not products of Z checks."""
+        if self.logicals is not None:
+            return self.logicals[1]
+        return _quotient_basis(_dense(self.hx).S, _dense(self.hz).S)
+
+    def logical_flips(
+        self, x: np.ndarray, z: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Which logicals the (k, n) residual planes x, z flip, for residuals with
+        a zero syndrome (e.g. error + any decoder's correction): uint8 (k, k_x)
+        anticommutations of x with logical_z and (k, k_z) of z with logical_x.
+        """
+        return gf2.matmul(x, self.logical_z.T), gf2.matmul(z, self.logical_x.T)
+
+    def syndromes(self, x: np.ndarray, z: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Batched (Z-check syndromes of x, X-check syndromes of z), uint8."""
+        return self.hz.syndromes(x), self.hx.syndromes(z)
+
+    def _method(self, method: str) -> str:
+        if method == "auto":
+            return "lookup" if self.n <= MAX_DECODE_QUBITS else "union_find"
+        if method not in ("lookup", "union_find"):
+            raise ValueError(
+                f"method must be 'auto', 'lookup' or 'union_find' (got {method!r})"
+            )
+        if method == "lookup" and self.n > MAX_DECODE_QUBITS:
+            raise ValueError(
+                f"table decoding needs n <= {MAX_DECODE_QUBITS} (got {self.n})"
+            )
+        return method
+
+    def decode(
+        self, x: np.ndarray, z: np.ndarray, *, method: str = "auto"
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Corrections (cx, cz) for (k, n) X and Z error planes. method="lookup"
+        gives minimum-weight table corrections (n <= MAX_DECODE_QUBITS);
+        method="union_find" runs decoders.union_find_decoder per sector, for
+        codes whose qubits sit in at most two checks of each type (surface and
+        toric codes). "auto" picks the table when it fits.
+        """
+        if self._method(method) == "union_find":
+            sx, sz = self.syndromes(x, z)
+            return union_find_decoder(self.hz, sx), union_find_decoder(self.hx, sz)
+        hx, hz = _dense(self.hx), _dense(self.hz)
+        cx = lookup_table(hz)[hz.syndromes(x, packed=True)]
+        cz = lookup_table(hx)[hx.syndromes(z, packed=True)]
+        return cx, cz
+
+    @cached_property
+    def _failure_tables(self) -> tuple[np.ndarray, np.ndarray]:
+        # per sector: does the lookup decoder leave a logical on error pattern i?
+        # a zero-syndrome residual is harmless iff it commutes with every logical
+        # of the other type (i.e. it is a product of checks)
+        self._method("lookup")
+        patterns = all_error_patterns(self.n)
+        residual = []
+        for checks in (_dense(self.hz), _dense(self.hx)):
+            corr = lookup_table(checks)[syndrome_table(checks).table]
+            residual.append(patterns ^ corr)
+        fails = tuple(flips.any(axis=1) for flips in self.logical_flips(*residual))
+        for failed in fails:
+            failed.flags.writeable = False
+        return fails
+
+    def logical_failures(
+        self, x: np.ndarray, z: np.ndarray, *, method: str = "auto"
+    ) -> np.ndarray:
+        """
+        (k,) bool, True where decoding the (k, n) X and Z planes leaves a
+        logical error in either sector (method as in decode). With the lookup
+        decoder each sector's outcome is precomputed for all 2**n patterns, so
+        this is one pack and one gather per plane.
+        """
+        if self._method(method) == "union_find":
+            cx, cz = self.decode(x, z, method="union_find")
+            flips_x, flips_z = self.logical_flips(x ^ cx, z ^ cz)
+            return flips_x.any(axis=1) | flips_z.any(axis=1)
+        fail_x, fail_z = self._failure_tables
+        return fail_x[pack_errors(x)] | fail_z[pack_errors(z)]
+
+
+@lru_cache(maxsize=None)
+def shor_code() -> CSSCode:
+    """Shor's [[9, 1, 3]] code: three bit-flip blocks inside a phase-flip code."""
+    hz = np.zeros((6, 9), dtype=np.uint8)
+    for i, q in enumerate([0, 1, 3, 4, 6, 7]):
+        hz[i, [q, q + 1]] = 1
+    hx = np.zeros((2, 9), dtype=np.uint8)
+    hx[0, :6] = 1
+    hx[1, 3:] = 1
+    return CSSCode(hx, hz)
+
+
+@lru_cache(maxsize=None)
+def steane_code() -> CSSCode:
+    """Steane's [[7, 1, 3]] code: hx = hz = the [7, 4] Hamming parity checks."""
+    hamming = (np.arange(1, 8)[None, :] >> np.arange(3)[:, None]) & 1
+    return CSSCode(hamming, hamming)
+
+
+def _csr_checks(support: np.ndarray, n: int) -> SparseParityCheck:
+    """SparseParityCheck from a (m, w) array of qubit indices, -1 for unused slots."""
+    support = np.sort(support, axis=1)  # -1 sorts first, so rows stay increasing
+    used = support >= 0
+    indptr = np.zeros(len(support) + 1, dtype=np.int64)
+    np.cumsum(used.sum(axis=1), out=indptr[1:])
+    return SparseParityCheck(indptr, support[used], n)
+
+
+@lru_cache(maxsize=32)
+def rotated_surface_code(d: int) -> CSSCode:
+    """
+    Rotated surface code [[d**2, 1, d]] for odd d >= 3. Data qubit (r, c) of
+    the d x d grid is index r*d + c. Each face of the grid (corners (r, c) to
+    (r+1, c+1)) is a weight-4 check, X-type when r + c is even; weight-2 X
+    checks close the top and bottom edges and Z checks the left and right.
+    Logical X is X on column 0 and logical Z is Z on row 0.
+    """
+    if d < 3 or d % 2 == 0:
+        raise ValueError(f"d must be odd and >= 3 (got {d})")
+    # faces (r, c) for r, c in -1..d-1 include the half-faces along the border
+    r, c = (
+        a.ravel()
+        for a in np.meshgrid(np.arange(-1, d), np.arange(-1, d), indexing="ij")
+    )
+    rows = r[:, None] + np.array([0, 0, 1, 1])
+    cols = c[:, None] + np.array([0, 1, 0, 1])
+    inside = (rows >= 0) & (rows < d) & (cols >= 0) & (cols < d)
+    support = np.where(inside, rows * d + cols, -1)
+    weight = inside.sum(axis=1)
+    is_x = (r + c) % 2 == 0
+    keep_x = is_x & ((weight == 4) | ((weight == 2) & ((r == -1) | (r == d - 1))))
+    keep_z = ~is_x & ((weight == 4) | ((weight == 2) & ((c == -1) | (c == d - 1))))
+    n = d * d
+    lx = np.zeros((1, n), dtype=np.uint8)
+    lx[0, np.arange(d) * d] = 1
+    lz = np.zeros((1, n), dtype=np.uint8)
+    lz[0, :d] = 1
+    centres = np.stack([r + 0.5, c + 0.5], axis=1)
+    grid = np.stack(np.divmod(np.arange(n), d), axis=1).astype(float)
+    return CSSCode(
+        _csr_checks(support[keep_x], n),
+        _csr_checks(support[keep_z], n),
+        logicals=(lx, lz),
+        qubit_coords=grid,
+        check_coords=(centres[keep_x], centres[keep_z]),
+    )
+
+
+@lru_cache(maxsize=32)
+def toric_code(d: int) -> CSSCode:
+    """
+    Toric code [[2 d**2, 2, d]] on a periodic d x d lattice (d >= 2), qubits on
+    edges: horizontal edge (r, c) -> (r, c+1) is index r*d + c, vertical edge
+    (r, c) -> (r+1, c) is d**2 + r*d + c. X checks are vertex stars and Z
+    checks plaquettes (d**2 each, one redundant per type). Logical pairs wind
+    around the two cycles of the torus.
+    """
+    if d < 2:
+        raise ValueError(f"d must be >= 2 (got {d})")
+    r, c = (a.ravel() for a in np.meshgrid(np.arange(d), np.arange(d), indexing="ij"))
+
+    def h(rr, cc):
+        return (rr % d) * d + cc % d
+
+    def v(rr, cc):
+        return d * d + (rr % d) * d + cc % d
+
+    stars = np.stack([h(r, c), h(r, c - 1), v(r, c), v(r - 1, c)], axis=1)
+    plaquettes = np.stack([h(r, c), h(r + 1, c), v(r, c), v(r, c + 1)], axis=1)
+    n = 2 * d * d
+    line = np.arange(d)
+    lx = np.zeros((2, n), dtype=np.uint8)
+    lx[0, v(0, line)] = 1  # crosses every column of plaquettes once
+    lx[1, h(line, 0)] = 1
+    lz = np.zeros((2, n), dtype=np.uint8)
+    lz[0, v(line, 0)] = 1  # pairs with lx[0] on v(0, 0)
+    lz[1, h(0, line)] = 1  # pairs with lx[1] on h(0, 0)
+    edges = np.concatenate(
+        [np.stack([r, c + 0.5], axis=1), np.stack([r + 0.5, c], axis=1)]
+    ).astype(float)
+    return CSSCode(
+        _csr_checks(stars, n),
+        _csr_checks(plaquettes, n),
+        logicals=(lx, lz),
+        qubit_coords=edges,
+        check_coords=(
+            np.stack([r, c], axis=1).astype(float),
+            np.stack([r + 0.5, c + 0.5], axis=1),
+        ),
+    )
@@ -1,17 +1,31 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 import numpy as np
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import breadth_first_order, connected_components
 
-from .codes import ThreeQubitBitFlip
+from .codes import ParityCheck, SparseParityCheck, ThreeQubitBitFlip, syndrome_table
+from .error_models import SparseFlips, all_error_patterns
 
 # Lookup: syndrome -> correction vector
 _BITFLIP_LUT = {
-    (0, 0): np.array([0, 0, 0], dtype=int),  # +1,+1 (no error)
-    (1, 0): np.array([1, 0, 0], dtype=int),  # -1,+1 -> flip qubit 1
-    (1, 1): np.array([0, 1, 0], dtype=int),  # -1,-1 -> flip qubit 2
-    (0, 1): np.array([0, 0, 1], dtype=int),  # +1,-1 -> flip qubit 3
+    (0, 0): np.array([0, 0, 0], dtype=np.uint8),  # +1,+1 (no error)
+    (1, 0): np.array([1, 0, 0], dtype=np.uint8),  # -1,+1 -> flip qubit 1
+    (1, 1): np.array([0, 1, 0], dtype=np.uint8),  # -1,-1 -> flip qubit 2
+    (0, 1): np.array([0, 0, 1], dtype=np.uint8),  # +1,-1 -> flip qubit 3
 }
 
+# Same table as an array, indexed by the packed syndrome s1 + 2*s2
+_BITFLIP_LUT_ARRAY = np.zeros((4, 3), dtype=np.uint8)
+for (_s1, _s2), _corr in _BITFLIP_LUT.items():
+    _BITFLIP_LUT_ARRAY[_s1 + 2 * _s2] = _corr
+
+# The erasure table has 2**n * 2**m * n entries and is built from a
+# 4**n * n temporary; n = 10 already means ~10 MB
+MAX_ERASURE_TABLE_QUBITS = 10
+
 
 def lookup_decoder_3q(
     code: ThreeQubitBitFlip, e_bits: np.ndarray
@@ -21,4 +35,255 @@ def lookup_decoder_3q(
     """
     syn = tuple(code.syndrome(e_bits).tolist())
     corr = _BITFLIP_LUT[syn]
-    return np.array(syn, dtype=int), corr
+    return np.array(syn, dtype=np.uint8), corr
+
+
+def lookup_decoder_3q_batch(
+    code: ThreeQubitBitFlip, e_bits: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batched lookup_decoder_3q for a (k, 3) array of error masks.
+    Returns uint8 (syndromes (k, 2), corrections (k, 3)).
+    """
+    syn = code.checks.syndromes(e_bits)
+    corr = _BITFLIP_LUT_ARRAY[syn[:, 0] + 2 * syn[:, 1]]
+    return syn, corr
+
+
+def lookup_decoder_3q_sparse(
+    code: ThreeQubitBitFlip, flips: SparseFlips
+) -> tuple[np.ndarray, np.ndarray]:
+    """lookup_decoder_3q_batch for sparse flip positions (see bsc_flip_indices)."""
+    syn = code.checks.syndromes_sparse(flips)
+    corr = _BITFLIP_LUT_ARRAY[syn[:, 0] + 2 * syn[:, 1]]
+    return syn, corr
+
+
+def majority_decode_sparse(flips: SparseFlips) -> np.ndarray:
+    """Majority vote from sparse flip positions; True where more than n/2 bits flipped."""
+    return flips.weights() > flips.n / 2
+
+
+def majority_decode_packed(words: np.ndarray, n: int) -> np.ndarray:
+    """
+    Majority vote on bit-packed words of shape (k, ceil(n/64)).
+    Returns a (k,) bool array, True where more than half the n bits are set.
+    """
+    weights = np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return weights > n / 2
+
+
+def majority_decode_erasure(
+    words: np.ndarray, erased: np.ndarray, rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """
+    Majority vote over the non-erased bits of each row of (k, n) words.
+    Ties, including fully erased words, are broken by a fair coin, since the
+    erased bits carry no information. Returns (k,) uint8 decoded bits.
+    """
+    rng = rng or np.random.default_rng()
+    kept = erased == 0
+    ones = np.count_nonzero((words != 0) & kept, axis=1)
+    votes = 2 * ones - np.count_nonzero(kept, axis=1)
+    coin = rng.random(len(votes)) < 0.5
+    return ((votes > 0) | ((votes == 0) & coin)).astype(np.uint8)
+
+
+@lru_cache(maxsize=32)
+def lookup_table(checks: ParityCheck) -> np.ndarray:
+    """
+    Minimum-weight lookup decoder for a small ParityCheck, built by enumerating
+    all 2**n error patterns. Returns a (2**m, n) array of corrections indexed by
+    the packed syndrome sum_i s_i * 2**i; unreachable syndromes map to no correction.
+    Cached per code (by content), so the table is read-only.
+    """
+    m, n = checks.S.shape
+    patterns = all_error_patterns(n)
+    syn_idx = syndrome_table(checks).table.astype(np.int64)  # row i = pattern i
+    order = np.argsort(np.count_nonzero(patterns, axis=1), kind="stable")
+    syn_seen, first = np.unique(syn_idx[order], return_index=True)
+    table = np.zeros((1 << m, n), dtype=np.uint8)
+    table[syn_seen] = patterns[order[first]]
+    table.flags.writeable = False
+    return table
+
+
+@lru_cache(maxsize=8)
+def erasure_lookup_table(checks: ParityCheck) -> np.ndarray:
+    """
+    Erasure-aware lookup decoder for a small ParityCheck: a (2**n, 2**m, n)
+    array of corrections indexed by [packed erasure mask, packed syndrome].
+    For each erasure pattern it picks, per syndrome, the correction with the
+    fewest flips outside the erased positions (flips on erased positions are
+    free, their values are random anyway). Cached per code, read-only.
+    Raises ValueError for n > MAX_ERASURE_TABLE_QUBITS.
+    """
+    m, n = checks.S.shape
+    if n > MAX_ERASURE_TABLE_QUBITS:
+        raise ValueError(
+            f"erasure tables need n <= {MAX_ERASURE_TABLE_QUBITS} (got {n})"
+        )
+    patterns = all_error_patterns(n)
+    syn_idx = syndrome_table(checks).table.astype(np.int64)  # row i = pattern i
+    # cost[mask, pattern] = weight of the pattern outside the erased set
+    outside = (1 - patterns)[:, None, :] & patterns[None, :, :]
+    cost = np.count_nonzero(outside, axis=2)
+    order = np.argsort(syn_idx * (n + 1) + cost, axis=1, kind="stable")
+    # every syndrome class has the same size, so each class starts at the
+    # same column of `order` in every row
+    syn_seen, first = np.unique(syn_idx[order[0]], return_index=True)
+    table = np.zeros((1 << n, 1 << m, n), dtype=np.uint8)
+    table[:, syn_seen] = patterns[order[:, first]]
+    table.flags.writeable = False
+    return table
+
+
+def lookup_decoder_erasure(
+    checks: ParityCheck,
+    e_bits: np.ndarray,
+    erased: np.ndarray,
+    table: np.ndarray | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Batched erasure-aware lookup decoding of (k, n) errors with known (k, n)
+    erasure masks. Returns uint8 (syndromes (k, m), corrections (k, n)).
+    Pass a prebuilt erasure_lookup_table to skip rebuilding it.
+    """
+    if table is None:
+        table = erasure_lookup_table(checks)
+    m, n = checks.S.shape
+    syn = checks.syndromes(e_bits)
+    syn_idx = syn @ (1 << np.arange(m))
+    mask_idx = np.asarray(erased, dtype=np.uint8) @ (1 << np.arange(n))
+    return syn, table[mask_idx, syn_idx]
+
+
+@lru_cache(maxsize=32)
+def _matching_graph(
+    checks: ParityCheck | SparseParityCheck,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Qubit j as an edge (u[j], v[j]) between the (at most two) checks it is in;
+    vertex m is a shared boundary that stands in for a missing check.
+    """
+    if isinstance(checks, SparseParityCheck):
+        m, n = checks.shape
+        rows = np.repeat(np.arange(m), np.diff(checks.indptr))
+        cols = checks.indices
+    else:
+        m, n = checks.S.shape
+        rows, cols = np.nonzero(checks.S)
+    order = np.argsort(cols, kind="stable")
+    rows, cols = rows[order], cols[order]
+    count = np.bincount(cols, minlength=n)
+    if (count > 2).any():
+        raise ValueError(
+            "union-find decoding needs every qubit in at most two checks "
+            f"(qubit {int(np.argmax(count))} is in {int(count.max())})"
+        )
+    start = np.cumsum(count) - count
+    u = np.full(n, m, dtype=np.int64)
+    v = np.full(n, m, dtype=np.int64)
+    u[count > 0] = rows[start[count > 0]]
+    v[count == 2] = rows[start[count == 2] + 1]
+    u.flags.writeable = v.flags.writeable = False
+    return u, v
+
+
+def _components(a: np.ndarray, b: np.ndarray, size: int) -> np.ndarray:
+    """Connected-component label of each of `size` vertices joined by edges (a, b)."""
+    graph = coo_array((np.ones(len(a)), (a, b)), shape=(size, size)).tocsr()
+    return connected_components(graph, directed=False)[1]
+
+
+def _clusters(
+    growth: np.ndarray, defect: np.ndarray, u: np.ndarray, v: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cluster labels of the vertices of k shots (joined by fully grown edges),
+    and a (k, V) mask of the vertices in odd clusters away from the boundary.
+    """
+    k, V = defect.shape
+    base = np.arange(0, k * V, V)[:, None]
+    full = growth >= 2
+    labels = _components((base + u)[full], (base + v)[full], k * V)
+    boundary = np.zeros(k * V)
+    boundary[V - 1 :: V] = 1
+    neutral = (np.bincount(labels, weights=defect.ravel()) % 2 == 0) | (
+        np.bincount(labels, weights=boundary) > 0
+    )
+    return labels, ~neutral[labels].reshape(k, V)
+
+
+def union_find_decoder(
+    checks: ParityCheck | SparseParityCheck, syn: np.ndarray
+) -> np.ndarray:
+    """
+    Batched union-find decoder for codes whose qubits each sit in at most two
+    checks, e.g. one sector of a surface or toric code. Returns (k, n) uint8
+    corrections reproducing the (k, m) syndromes; raises ValueError if some
+    syndrome has none (e.g. an odd number of defects on a torus).
+
+    Checks are vertices and qubits edges (qubits in one check end on a shared
+    boundary vertex). Clusters with an odd number of defects and no boundary
+    grow by half an edge per round until every cluster is neutral; each one is
+    then corrected on a BFS spanning tree (rooted at the boundary if it has
+    it) by flipping the edges whose subtree holds an odd number of defects.
+    All k shots form one disjoint graph, so each round is one csgraph call.
+    """
+    u, v = _matching_graph(checks)
+    syn = np.atleast_2d(np.asarray(syn, dtype=np.uint8))
+    k, m = syn.shape
+    n, V = len(u), m + 1
+    size = k * V
+    defect = np.zeros((k, V))
+    defect[:, :m] = syn & 1
+    growth = np.zeros((k, n), dtype=np.uint8)  # in half edges, full at 2
+    live = np.arange(k)  # shots that still have an active cluster
+    while live.size:
+        _, active = _clusters(growth[live], defect[live], u, v)
+        busy = active.any(axis=1)
+        live, active = live[busy], active[busy]
+        grown = np.minimum(growth[live] + active[:, u] + active[:, v], 2)
+        if (grown == growth[live]).all(axis=1).any():
+            raise ValueError("syndrome has no correction (odd defects, no boundary)")
+        growth[live] = grown
+    labels, _ = _clusters(growth, defect, u, v)
+    base = np.arange(0, size, V)[:, None]
+    head, tail = base + u, base + v  # (k, n) vertex ids of every edge
+    full = growth >= 2
+    defect = defect.ravel()
+
+    # one virtual root joined to each cluster's boundary vertex, else its first
+    root = size
+    first = np.full(labels.max() + 1, size)
+    np.minimum.at(first, labels, np.arange(size))
+    first[labels[m::V]] = np.arange(m, size, V)
+    a = np.concatenate([head[full], np.full(len(first), root)])
+    b = np.concatenate([tail[full], first])
+    graph = coo_array((np.ones(len(a)), (a, b)), shape=(size + 1, size + 1)).tocsr()
+    _, pred = breadth_first_order(graph, root, directed=False, return_predecessors=True)
+    # depth by pointer jumping, then subtree defect parities level by level
+    up = np.where(pred < 0, root, pred)
+    depth = (up != np.arange(size + 1)).astype(np.int64)
+    while (up != root).any():
+        depth += depth[up]
+        up = up[up]
+    parity = np.append(defect, 0).astype(np.int64)
+    by_depth = np.argsort(depth, kind="stable")
+    cuts = np.searchsorted(depth[by_depth], np.arange(depth.max() + 2))
+    for level in range(int(depth.max()), 1, -1):
+        nodes = by_depth[cuts[level] : cuts[level + 1]]
+        np.add.at(parity, pred[nodes], parity[nodes])
+    # flip the tree edge above every odd subtree (edges to the root are virtual)
+    odd = np.flatnonzero((parity[:size] & 1) & (pred[:size] != root))
+    shot, qubit = np.nonzero(full)
+    key = np.minimum(head[full], tail[full]) * (size + 1) + np.maximum(
+        head[full], tail[full]
+    )
+    sort = np.argsort(key, kind="stable")
+    want = np.minimum(odd, pred[odd]) * (size + 1) + np.maximum(odd, pred[odd])
+    hit = sort[np.searchsorted(key[sort], want)]
+    corr = np.zeros((k, n), dtype=np.uint8)
+    corr[shot[hit], qubit[hit]] = 1
+    return corr
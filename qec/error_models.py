@@ -1,17 +1,384 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from typing import Iterator, Protocol
+
 import numpy as np
 
+# Default chunk budget for streamed sampling: about 2**20 sampled bits per chunk
+DEFAULT_CHUNK_BITS = 1 << 20
+
+
+class UniformSource(Protocol):
+    """
+    Anything with Generator.random(size): a np.random.Generator or a
+    RandomPool. The samplers that only draw uniforms accept either as `rng`.
+    """
+
+    def random(self, size=None): ...
+
+
+class RandomPool:
+    """
+    Buffered source of uniforms: refills `block` doubles from a Generator at
+    once and serves slices, so many tiny draws (e.g. bsc_flip_mask(3, p) per
+    shot) do not each pay the Generator call overhead.
+
+    pool.random(size) mirrors Generator.random, so a pool can be passed as
+    `rng` to bsc_flip_mask, erasure_flip_mask and the ErrorModel samplers.
+    The values served are exactly the Generator's own stream, in order.
+    """
+
+    def __init__(self, rng: np.random.Generator | None = None, block: int = 1 << 16):
+        self.rng = rng or np.random.default_rng()
+        self.block = block
+        self._buf = np.empty(0)
+        self._pos = 0
+
+    def random(self, size=None):
+        if type(size) is int:  # fast path: a flat slice of the buffer
+            end = self._pos + size
+            if end <= len(self._buf):
+                self._pos = end
+                return self._buf[end - size : end]
+        if size is None:
+            return float(self.random(1)[0])
+        shape = (size,) if np.isscalar(size) else tuple(size)
+        count = int(np.prod(shape))
+        left = len(self._buf) - self._pos
+        if count <= left:
+            out = self._buf[self._pos : self._pos + count]
+            self._pos += count
+            return out.reshape(shape)
+        head = self._buf[self._pos :]
+        if count - left >= self.block:
+            # large request: take what is buffered, draw the rest directly
+            out = np.concatenate([head, self.rng.random(count - left)])
+            self._buf, self._pos = np.empty(0), 0
+            return out.reshape(shape)
+        self._buf, self._pos = self.rng.random(self.block), count - left
+        return np.concatenate([head, self._buf[: self._pos]]).reshape(shape)
+
 
 def bsc_flip_mask(
-    n: int, p: float, size: int | None = None, rng: np.random.Generator | None = None
+    n: int, p: float, size: int | None = None, rng: UniformSource | None = None
 ) -> np.ndarray:
     """
     Bernoulli flip mask(s) for a Binary Symmetric Channel with prob p.
     - If size is None: returns (n,) mask.
     - If size is k: returns (k, n) masks.
+    Masks are uint8 0/1 (one byte per bit).
     """
     rng = rng or np.random.default_rng()
     if size is None:
-        return (rng.random(n) < p).astype(int)
-    return (rng.random((size, n)) < p).astype(int)
+        return (rng.random(n) < p).view(np.uint8)
+    return (rng.random((size, n)) < p).view(np.uint8)
+
+
+def chunk_sizes(trials: int, n: int, chunk_size: int | None = None) -> Iterator[int]:
+    """
+    Split `trials` into consecutive chunk sizes. With chunk_size=None each chunk
+    holds about DEFAULT_CHUNK_BITS sampled bits, so memory does not grow with trials.
+    """
+    chunk = chunk_size or max(1, DEFAULT_CHUNK_BITS // max(n, 1))
+    for start in range(0, trials, chunk):
+        yield min(chunk, trials - start)
+
+
+def bsc_flip_mask_chunks(
+    n: int,
+    p: float,
+    trials: int,
+    chunk_size: int | None = None,
+    rng: np.random.Generator | None = None,
+) -> Iterator[np.ndarray]:
+    """Stream `trials` BSC flip masks as (k, n) chunks (see chunk_sizes)."""
+    rng = rng or np.random.default_rng()
+    for k in chunk_sizes(trials, n, chunk_size):
+        yield bsc_flip_mask(n, p, size=k, rng=rng)
+
+
+# Binary digits of p used by the packed sampler: p is rounded to a multiple
+# of 2**-32, so the flip rate is off by at most 2**-33 and a mask costs at
+# most 32 random words per 64 output bits
+_PACKED_P_BITS = 32
+
+
+def _random_words(shape, rng: np.random.Generator) -> np.ndarray:
+    """Uniform uint64 words, i.e. 64 fair random bits per draw."""
+    return rng.integers(
+        0, np.iinfo(np.uint64).max, size=shape, dtype=np.uint64, endpoint=True
+    )
+
+
+def bsc_packed_mask(
+    n: int, p: float, size: int, rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """
+    Bit-packed BSC flip masks: returns (size, ceil(n/64)) uint64 words.
+    Bit j of word w is qubit 64*w + j; padding bits past n are always 0.
+
+    Each output bit is 1 with probability p, built from the binary expansion
+    p = 0.b1 b2 ... bk by folding fair random words from the least
+    significant digit up (OR for a 1 digit, AND for a 0 digit), so every
+    random word yields 64 Bernoulli(p) bits at once. p is rounded to
+    _PACKED_P_BITS digits (absolute error <= 2**-33), so p below ~1e-10 reads
+    as 0; use the sparse samplers there. Costs one word per digit up to the
+    last 1, e.g. 1 for p=0.5, 2 for p=0.25 and 31 for p=0.1.
+    """
+    rng = rng or np.random.default_rng()
+    shape = (size, -(-n // 64))
+    scaled = round(min(max(float(p), 0.0), 1.0) * (1 << _PACKED_P_BITS))
+    if scaled >= 1 << _PACKED_P_BITS:
+        words = np.full(shape, np.iinfo(np.uint64).max, dtype=np.uint64)
+    elif scaled == 0:
+        words = np.zeros(shape, dtype=np.uint64)
+    else:
+        # digits b1 .. bk of p = 0.b1 b2 ... bk, trailing zeros dropped
+        k = _PACKED_P_BITS - (scaled & -scaled).bit_length() + 1
+        digits = [(scaled >> (_PACKED_P_BITS - i)) & 1 for i in range(1, k + 1)]
+        words = _random_words(shape, rng)  # lowest nonzero digit
+        for bit in reversed(digits[:-1]):
+            if bit:
+                words |= _random_words(shape, rng)
+            else:
+                words &= _random_words(shape, rng)
+    if n % 64:
+        words[:, -1] &= np.uint64((1 << (n % 64)) - 1)
+    return words
+
+
+def all_error_patterns(n: int) -> np.ndarray:
+    """All 2**n flip masks as a (2**n, n) array; row i has bit j of i on qubit j."""
+    idx = np.arange(1 << n, dtype=np.int64)
+    return ((idx[:, None] >> np.arange(n)) & 1).astype(np.uint8)
+
+
+def pattern_counts(
+    n: int, p: float, trials: int, rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """
+    How often each of the 2**n flip patterns (rows of all_error_patterns(n))
+    occurs in `trials` BSC trials, drawn with a single multinomial call.
+    Cost is O(2**n) whatever the number of trials.
+    """
+    rng = rng or np.random.default_rng()
+    w = np.count_nonzero(all_error_patterns(n), axis=1)
+    probs = p**w * (1 - p) ** (n - w)
+    return rng.multinomial(trials, probs / probs.sum())
+
+
+@dataclass(frozen=True)
+class SparseFlips:
+    """
+    Flip locations of `size` trials on n bits, CSR style:
+    trial t flipped qubits indices[indptr[t]:indptr[t + 1]] (increasing order).
+    """
+
+    indptr: np.ndarray  # (size + 1,) int64
+    indices: np.ndarray  # (total flips,) int64
+    n: int
+
+    @property
+    def size(self) -> int:
+        return len(self.indptr) - 1
+
+    def weights(self) -> np.ndarray:
+        """Number of flips in each trial."""
+        return np.diff(self.indptr)
+
+    def trial_ids(self) -> np.ndarray:
+        """Trial index of each entry of `indices` (the flat, COO-style view)."""
+        return np.repeat(np.arange(self.size), self.weights())
+
+    def to_dense(self) -> np.ndarray:
+        """(size, n) uint8 masks, same layout as bsc_flip_mask."""
+        dense = np.zeros((self.size, self.n), dtype=np.uint8)
+        dense[self.trial_ids(), self.indices] = 1
+        return dense
+
+
+def bsc_flip_indices(
+    n: int, p: float, size: int, rng: np.random.Generator | None = None
+) -> SparseFlips:
+    """
+    Sparse BSC sampler: only the positions of the flips are drawn.
+    The size*n bits are read as one stream and the gaps between consecutive
+    flips are Geometric(p), so the cost scales with the number of flips
+    (about p*n*size) rather than with the number of bits.
+    """
+    rng = rng or np.random.default_rng()
+    total = size * n
+    if p <= 0.0 or total == 0:
+        flat = np.zeros(0, dtype=np.int64)
+    elif p >= 1.0:
+        flat = np.arange(total, dtype=np.int64)
+    else:
+        blocks = []
+        pos = -1  # flat position of the last flip drawn so far
+        mean = (total - pos) * p
+        while pos < total:
+            block = int(mean + 4 * np.sqrt(mean) + 16)
+            steps = np.cumsum(rng.geometric(p, size=block), dtype=np.int64) + pos
+            blocks.append(steps)
+            pos = int(steps[-1])
+            mean = (total - pos) * p
+        flat = np.concatenate(blocks)
+        flat = flat[: np.searchsorted(flat, total)]
+    trial, qubit = np.divmod(flat, n)
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(trial, minlength=size), out=indptr[1:])
+    return SparseFlips(indptr=indptr, indices=qubit, n=n)
+
+
+def erasure_flip_mask(
+    n: int,
+    p_erase: float,
+    p_flip: float = 0.0,
+    size: int | None = None,
+    rng: UniformSource | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mixed erasure + flip channel on bits, returns uint8 (erased, flips) masks.
+    Each bit is erased with prob p_erase (its value becomes a fair coin, and its
+    location is known); otherwise it flips with prob p_flip. One uniform per bit.
+    Shapes follow bsc_flip_mask: (n,) if size is None, else (size, n).
+    """
+    rng = rng or np.random.default_rng()
+    u = rng.random(n if size is None else (size, n))
+    erased = u < p_erase
+    flips = (u < p_erase / 2) | (
+        (u >= p_erase) & (u < p_erase + (1 - p_erase) * p_flip)
+    )
+    return erased.view(np.uint8), flips.view(np.uint8)
+
+
+class ErrorModel(Protocol):
+    """
+    A batched noise model. sample(batch, n, rng) returns the (x, z) bit-planes
+    of the Pauli error on n qubits for `batch` trials, each (batch, n) uint8:
+    x marks X (bit) flips, z marks Z (phase) flips, both set means Y.
+    Classical codes only look at x.
+    """
+
+    def sample(
+        self, batch: int, n: int, rng: UniformSource
+    ) -> tuple[np.ndarray, np.ndarray]: ...
+
+
+def _no_flips(batch: int, n: int) -> np.ndarray:
+    """A read-only all-zero plane that costs no memory."""
+    return np.broadcast_to(np.uint8(0), (batch, n))
+
+
+@dataclass(frozen=True)
+class BSC:
+    """Independent flips with prob p on one plane ('X' or 'Z'); the other is clean."""
+
+    p: float
+    basis: str = "X"
+
+    def sample(self, batch, n, rng):
+        flips = bsc_flip_mask(n, self.p, size=batch, rng=rng)
+        if self.basis == "X":
+            return flips, _no_flips(batch, n)
+        return _no_flips(batch, n), flips
+
+
+@dataclass(frozen=True)
+class BiasedXZ:
+    """Independent X flips with prob px and Z flips with prob pz (Y when both occur)."""
+
+    px: float
+    pz: float
+
+    def sample(self, batch, n, rng):
+        u = rng.random((2, batch, n))
+        return (u[0] < self.px).view(np.uint8), (u[1] < self.pz).view(np.uint8)
+
+
+@dataclass(frozen=True)
+class Depolarizing:
+    """With prob p apply X, Y or Z (p/3 each), else nothing; one uniform per qubit."""
+
+    p: float
+
+    def sample(self, batch, n, rng):
+        u = rng.random((batch, n))
+        # X on [0, p/3), Y on [p/3, 2p/3), Z on [2p/3, p)
+        x = u < 2 * self.p / 3
+        z = (u >= self.p / 3) & (u < self.p)
+        return x.view(np.uint8), z.view(np.uint8)
+
+
+@dataclass(frozen=True)
+class Erasure:
+    """
+    Each qubit is erased with prob p and replaced by a maximally mixed state,
+    i.e. a uniformly random Pauli (I, X, Y, Z) on the erased positions.
+    """
+
+    p: float
+
+    def sample(self, batch, n, rng):
+        # erased bits get a fair X coin from erasure_flip_mask, plus a fair Z coin
+        erased, x = erasure_flip_mask(n, self.p, size=batch, rng=rng)
+        z = (rng.random((batch, n)) < 0.5).view(np.uint8) & erased
+        return x, z
+
+
+@dataclass(frozen=True)
+class GilbertElliott:
+    """
+    Two-state Markov (Gilbert-Elliott) burst channel along the n positions.
+    The hidden state moves good -> bad with prob p_gb and bad -> good with
+    prob p_bg per position (starting from the stationary mix); a position
+    flips with prob p_good or p_bad depending on the state. X plane only.
+    """
+
+    p_gb: float
+    p_bg: float
+    p_good: float = 0.0
+    p_bad: float = 0.5
+
+    @property
+    def mean_flip_rate(self) -> float:
+        """Long-run flip probability per position."""
+        total = self.p_gb + self.p_bg
+        pi_bad = self.p_gb / total if total > 0 else 0.0
+        return (1 - pi_bad) * self.p_good + pi_bad * self.p_bad
+
+    def states(self, batch: int, n: int, rng: UniformSource) -> np.ndarray:
+        """
+        (batch, n) bool hidden states (True = bad), without a loop over positions.
+        One uniform u per step drives both rows of the transition:
+        next = (u < p_gb) from good, (u < 1 - p_bg) from bad. Each step is then
+        a map on {good, bad} that is either constant or passes the state through
+        (kept or inverted), so the state is the value of the last constant map
+        XOR the parity of inverting maps since.
+        """
+        total = self.p_gb + self.p_bg
+        pi_bad = self.p_gb / total if total > 0 else 0.0
+        u = rng.random((batch, n))
+        from_good = u < self.p_gb
+        from_bad = u < 1 - self.p_bg
+        from_good[:, 0] = from_bad[:, 0] = u[:, 0] < pi_bad  # stationary start
+        const = from_good == from_bad
+        invert = from_good & ~from_bad
+        last = np.maximum.accumulate(np.where(const, np.arange(n), 0), axis=1)
+        flips_since = np.cumsum(invert, axis=1, dtype=np.int32)
+        rows = np.arange(batch)[:, None]
+        parity = (flips_since - flips_since[rows, last]) & 1
+        return from_good[rows, last] ^ parity.astype(bool)
+
+    def sample(self, batch, n, rng):
+        bad = self.states(batch, n, rng)
+        flips = rng.random((batch, n)) < np.where(bad, self.p_bad, self.p_good)
+        return flips.view(np.uint8), _no_flips(batch, n)
+
+
+def as_error_model(p: float | ErrorModel, basis: str = "X") -> ErrorModel:
+    """Wrap a bare flip probability as BSC(p, basis); models pass through."""
+    if isinstance(p, (int, float, np.floating)):
+        return BSC(float(p), basis)
+    return p
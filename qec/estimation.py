@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+from scipy.special import gammaln, xlog1py, xlogy
+from scipy.stats import beta, norm
+
+from .rng import StreamKey, as_generator
+
+
+@dataclass(frozen=True)
+class MCResult:
+    """
+    Outcome of a Monte-Carlo run.
+    - estimate: failures / trials for plain sampling; the reweighted mean for
+      importance_sample and the stratified mean for stratified_sample
+    - low, high: confidence interval for the logical error rate
+    - trials, failures: samples spent and failures seen among them. For the
+      rare-event estimators the samples are drawn from the tilted distribution
+      or the weight classes, so failures / trials is not the estimate; use
+      estimate and stderr
+    - seconds: wall time
+    - converged: True if the precision target was met before the budget ran out
+    - stderr: standard error of the estimate
+    """
+
+    estimate: float
+    low: float
+    high: float
+    trials: int
+    failures: int
+    seconds: float
+    converged: bool = True
+    stderr: float = float("nan")
+
+
+def wilson_interval(
+    failures: int, trials: int, confidence: float = 0.95
+) -> tuple[float, float]:
+    """Wilson score interval for a binomial proportion."""
+    if trials <= 0:
+        return 0.0, 1.0
+    z = norm.ppf(0.5 + confidence / 2)
+    phat = failures / trials
+    denom = 1 + z**2 / trials
+    centre = (phat + z**2 / (2 * trials)) / denom
+    half = z * np.sqrt(phat * (1 - phat) / trials + z**2 / (4 * trials**2)) / denom
+    low = 0.0 if failures == 0 else max(0.0, centre - half)
+    high = 1.0 if failures == trials else min(1.0, centre + half)
+    return float(low), float(high)
+
+
+def clopper_pearson_interval(
+    failures: int, trials: int, confidence: float = 0.95
+) -> tuple[float, float]:
+    """Exact (conservative) Clopper-Pearson interval for a binomial proportion."""
+    if trials <= 0:
+        return 0.0, 1.0
+    alpha = 1 - confidence
+    low = beta.ppf(alpha / 2, failures, trials - failures + 1) if failures > 0 else 0.0
+    high = (
+        beta.ppf(1 - alpha / 2, failures + 1, trials - failures)
+        if failures < trials
+        else 1.0
+    )
+    return float(low), float(high)
+
+
+_INTERVALS = {"wilson": wilson_interval, "clopper-pearson": clopper_pearson_interval}
+
+
+def adaptive_mc(
+    count_failures: Callable[[int, np.random.Generator], int],
+    *,
+    rel_err: float | None = 0.1,
+    ci_width: float | None = None,
+    interval: str = "wilson",
+    confidence: float = 0.95,
+    batch: int = 10_000,
+    max_trials: int = 100_000_000,
+    max_seconds: float | None = None,
+    rng: np.random.Generator | StreamKey | None = None,
+) -> MCResult:
+    """
+    Run a failure counter in growing batches until the interval is tight enough.
+
+    count_failures(trials, rng) -> int is any fixed-size estimator kernel, e.g.
+    functools.partial(analytics.repetition_failures, 7, 0.05). With a
+    StreamKey as rng, batch b draws from its own stream (chunk b), so a rerun
+    with the same key replays the same batches.
+
+    Stops as soon as either target is met:
+    - rel_err: interval half-width <= rel_err * estimate (needs >= 1 failure)
+    - ci_width: high - low <= ci_width
+    or when max_trials / max_seconds is spent (then converged=False).
+    Batches double in size so the overhead per check stays small.
+    """
+    if interval not in _INTERVALS:
+        raise ValueError(
+            f"interval must be one of {sorted(_INTERVALS)} (got {interval!r})"
+        )
+    if rel_err is None and ci_width is None:
+        raise ValueError("Set at least one of rel_err or ci_width.")
+    ci = _INTERVALS[interval]
+    t0 = time.perf_counter()
+    trials = failures = 0
+    low, high = 0.0, 1.0
+    converged = False
+    if not isinstance(rng, StreamKey):
+        rng = rng or np.random.default_rng()
+    for b in itertools.count():
+        if trials >= max_trials:
+            break
+        k = min(batch, max_trials - trials)
+        failures += int(count_failures(k, as_generator(rng, b)))
+        trials += k
+        low, high = ci(failures, trials, confidence)
+        est = failures / trials
+        if ci_width is not None and high - low <= ci_width:
+            converged = True
+        if rel_err is not None and failures > 0 and (high - low) / 2 <= rel_err * est:
+            converged = True
+        if converged:
+            break
+        if max_seconds is not None and time.perf_counter() - t0 >= max_seconds:
+            break
+        batch *= 2
+    est = failures / trials if trials else 0.0
+    return MCResult(
+        estimate=est,
+        low=low,
+        high=high,
+        trials=trials,
+        failures=failures,
+        seconds=time.perf_counter() - t0,
+        converged=converged,
+        stderr=float(np.sqrt(est * (1 - est) / trials)) if trials else float("nan"),
+    )
+
+
+def _normal_result(
+    est: float, stderr: float, trials: int, failures: int, t0: float, confidence: float
+) -> MCResult:
+    z = norm.ppf(0.5 + confidence / 2)
+    return MCResult(
+        estimate=est,
+        low=float(max(0.0, est - z * stderr)),
+        high=float(min(1.0, est + z * stderr)),
+        trials=trials,
+        failures=failures,
+        seconds=time.perf_counter() - t0,
+        stderr=stderr,
+    )
+
+
+def importance_sample(
+    fails: Callable[[np.ndarray], np.ndarray],
+    n: int,
+    p: float,
+    trials: int = 10_000,
+    *,
+    q: float | None = None,
+    confidence: float = 0.95,
+    rng: np.random.Generator | None = None,
+) -> MCResult:
+    """
+    Unbiased importance-sampling estimate of P(fails(e)) for i.i.d. flips with prob p.
+
+    fails maps a (k, n) 0/1 error array to a (k,) bool array. Errors are drawn
+    with the tilted flip probability q and reweighted by the likelihood ratio
+    (p/q)^w ((1-p)/(1-q))^(n-w) for weight w. The default q = max(p,
+    (n//2 + 1)/n) puts the typical sample at the majority-failure weight (and
+    never tilts below p), which suits repetition-type codes.
+    The interval is the normal one from the sample standard error; `failures`
+    counts the failing tilted samples.
+    """
+    rng = rng or np.random.default_rng()
+    t0 = time.perf_counter()
+    if q is None:
+        q = max(p, (n // 2 + 1) / n)
+    e = (rng.random((trials, n)) < q).view(np.uint8)
+    w = np.count_nonzero(e, axis=1)
+    failed = np.asarray(fails(e), dtype=bool)
+    log_ratio = xlogy(w, p) - xlogy(w, q) + xlog1py(n - w, -p) - xlog1py(n - w, -q)
+    vals = np.where(failed, np.exp(log_ratio), 0.0)
+    est = float(vals.mean())
+    stderr = float(vals.std(ddof=1) / np.sqrt(trials)) if trials > 1 else float("nan")
+    return _normal_result(est, stderr, trials, int(failed.sum()), t0, confidence)
+
+
+def weight_patterns(
+    n: int, w: int, size: int, rng: np.random.Generator | None = None
+) -> np.ndarray:
+    """(size, n) 0/1 masks, each with exactly w ones at uniformly random positions."""
+    rng = rng or np.random.default_rng()
+    if w == 0:
+        return np.zeros((size, n), dtype=np.uint8)
+    u = rng.random((size, n))
+    kth = np.partition(u, w - 1, axis=1)[:, w - 1 : w]
+    return (u <= kth).view(np.uint8)
+
+
+def stratified_sample(
+    fails: Callable[[np.ndarray], np.ndarray],
+    n: int,
+    p: float,
+    trials: int = 10_000,
+    *,
+    confidence: float = 0.95,
+    rng: np.random.Generator | None = None,
+) -> MCResult:
+    """
+    Stratified-by-weight estimate of P(fails(e)) for i.i.d. flips with prob p.
+
+    P = sum_w P(W = w) * P(fail | W = w), with P(W = w) the exact binomial
+    weights. Each weight class gets an equal share of the trials (classes with
+    a single pattern are evaluated exactly), so high-weight failures are
+    sampled even when P(W = w) is tiny. Unbiased; the standard error sums the
+    per-class binomial variances. `failures` counts failing samples over all
+    classes, unweighted.
+    """
+    rng = rng or np.random.default_rng()
+    t0 = time.perf_counter()
+    ws = np.arange(n + 1)
+    log_pw = (
+        gammaln(n + 1)
+        - gammaln(ws + 1)
+        - gammaln(n - ws + 1)
+        + xlogy(ws, p)
+        + xlog1py(n - ws, -p)
+    )
+    pw = np.exp(log_pw)
+    per_class = max(1, trials // max(1, n - 1))
+    est = var = 0.0
+    used = failures = 0
+    for w in ws:
+        if pw[w] == 0.0:
+            continue
+        k = 1 if w in (0, n) else per_class
+        failed = np.asarray(fails(weight_patterns(n, w, k, rng=rng)), dtype=bool)
+        f = failed.mean()
+        est += pw[w] * f
+        if k > 1:
+            var += pw[w] ** 2 * f * (1 - f) / (k - 1)
+        used += k
+        failures += int(failed.sum())
+    return _normal_result(
+        float(est), float(np.sqrt(var)), used, failures, t0, confidence
+    )
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import numpy as np
+
+# Rows are packed like bsc_packed_mask: bit j of word w is column 64*w + j.
+# Elimination works on 8-column strips (one byte of each row): up to 8 pivots
+# are found from the strip bytes alone, then every other row is cleared in one
+# pass by XOR-ing a row from a 256-entry table of pivot combinations
+# ("method of four Russians"), instead of one full pass per pivot.
+
+
+def pack_rows(A: np.ndarray) -> np.ndarray:
+    """(m, n) 0/1 array -> (m, ceil(n/64)) uint64 words."""
+    A = np.atleast_2d(np.asarray(A, dtype=np.uint8)) & 1
+    m, n = A.shape
+    packed = np.packbits(A, axis=1, bitorder="little")
+    out = np.zeros((m, 8 * -(-n // 64)), dtype=np.uint8)
+    out[:, : packed.shape[1]] = packed
+    return out.view(np.uint64)
+
+
+def unpack_rows(words: np.ndarray, n: int) -> np.ndarray:
+    """(m, W) uint64 words -> (m, n) uint8 0/1 array (inverse of pack_rows)."""
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    return np.unpackbits(words.view(np.uint8), axis=1, count=n, bitorder="little")
+
+
+def matmul(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+    """
+    A @ B over GF(2) as uint8. Runs as a float32 BLAS product, which counts
+    exactly while the inner dimension stays below 2**24.
+    """
+    A = np.atleast_2d(np.asarray(A, dtype=np.float32))
+    B = np.atleast_2d(np.asarray(B, dtype=np.float32))
+    if A.shape[1] >= 1 << 24:
+        raise ValueError(f"inner dimension too large for exact counts ({A.shape[1]})")
+    return (A @ B % 2).astype(np.uint8)
+
+
+def _bits(words: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    """(m, len(cols)) uint8 values of the given columns of packed rows."""
+    cols = np.asarray(cols, dtype=np.int64)
+    shift = (cols % 64).astype(np.uint64)
+    return ((words[:, cols // 64] >> shift) & np.uint64(1)).astype(np.uint8)
+
+
+def _combo_table(rows: np.ndarray, bits: list[int]) -> np.ndarray:
+    """(256, W) table: entry v is the XOR of rows[j] over the j with bit bits[j] set in v."""
+    v = np.arange(256)
+    table = np.zeros((256, rows.shape[1]), dtype=np.uint64)
+    for row, bit in zip(rows, bits):
+        table[(v >> bit) & 1 == 1] ^= row
+    return table
+
+
+def _echelon(M: np.ndarray, ncols: int, reduced: bool) -> list[int]:
+    """
+    Row-reduce packed rows M in place over the first ncols columns (the rest
+    are carried along, e.g. an augmented right-hand side). Returns the pivot
+    columns; row i of M is the pivot row of pivots[i] and rows past the rank
+    are zero in the first ncols columns.
+    """
+    m = M.shape[0]
+    strips = M.view(np.uint8)  # byte b of a row holds columns 8b .. 8b+7
+    pivots: list[int] = []
+    r = 0
+    for c0 in range(0, ncols, 8):
+        if r == m:
+            break
+        b, w0 = c0 // 8, c0 // 64
+        # find the strip's pivots; they are kept reduced against each other, so
+        # any row's strip byte v reduces to reduce[v] in a single lookup
+        found: list[int] = []
+        reduce = np.arange(256, dtype=np.uint8)
+        for bit in range(min(8, ncols - c0)):
+            start = r + len(found)
+            hit = np.flatnonzero((reduce[strips[start:, b]] >> bit) & 1)
+            if hit.size == 0:
+                continue
+            i = start + int(hit[0])
+            M[[start, i]] = M[[i, start]]
+            v = int(strips[start, b])
+            for j, pbit in enumerate(found):
+                if (v >> pbit) & 1:
+                    M[start] ^= M[r + j]
+            for j in range(len(found)):
+                if (strips[r + j, b] >> bit) & 1:
+                    M[r + j] ^= M[start]
+            found.append(bit)
+            v = np.arange(256)
+            reduce = np.arange(256, dtype=np.uint8)
+            for j, pbit in enumerate(found):
+                reduce[(v >> pbit) & 1 == 1] ^= strips[r + j, b]
+        if not found:
+            continue
+        k = len(found)
+        # pivot rows are zero left of the strip, so only words w0.. change
+        table = _combo_table(M[r : r + k, w0:], found)
+        mask = np.uint8(sum(1 << bit for bit in found))
+        for lo, hi in ((r + k, m), (0, r if reduced else 0)):
+            idx = strips[lo:hi, b] & mask
+            nz = np.flatnonzero(idx)
+            if 2 * len(nz) > hi - lo:  # dense: a contiguous pass beats a scatter
+                M[lo:hi, w0:] ^= table[idx]
+            else:
+                M[lo + nz, w0:] ^= table[idx[nz]]
+        pivots.extend(c0 + bit for bit in found)
+        r += k
+    return pivots
+
+
+def row_reduce(A: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Reduced row echelon form of A over GF(2).
+    Returns (R, pivots): the rank nonzero rows as a (rank, n) uint8 array and
+    their pivot columns, so R[:, pivots] is the identity.
+    """
+    A = np.atleast_2d(np.asarray(A, dtype=np.uint8))
+    n = A.shape[1]
+    M = pack_rows(A)
+    pivots = _echelon(M, n, reduced=True)
+    return unpack_rows(M[: len(pivots)], n), np.asarray(pivots, dtype=np.int64)
+
+
+def rank(A: np.ndarray) -> int:
+    """Rank of A over GF(2)."""
+    A = np.atleast_2d(np.asarray(A, dtype=np.uint8))
+    return len(_echelon(pack_rows(A), A.shape[1], reduced=False))
+
+
+def nullspace(A: np.ndarray) -> np.ndarray:
+    """Basis of {x : A x = 0} over GF(2), as the rows of an (n - rank, n) uint8 array."""
+    A = np.atleast_2d(np.asarray(A, dtype=np.uint8))
+    n = A.shape[1]
+    M = pack_rows(A)
+    pivots = np.asarray(_echelon(M, n, reduced=True), dtype=np.int64)
+    free = np.setdiff1d(np.arange(n), pivots)
+    basis = np.zeros((len(free), n), dtype=np.uint8)
+    basis[np.arange(len(free)), free] = 1
+    # free column f is set in pivot row i exactly when x[pivots[i]] must be set
+    basis[:, pivots] = _bits(M[: len(pivots)], free).T
+    return basis
+
+
+def solve(A: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    One solution x of A x = b over GF(2) (free variables set to 0).
+    b is a length-m vector, or a (k, m) batch of right-hand sides (one per
+    row), giving a (k, n) batch of solutions. Raises ValueError if some b is
+    not in the column space of A.
+    """
+    A = np.atleast_2d(np.asarray(A, dtype=np.uint8))
+    b = np.asarray(b, dtype=np.uint8)
+    m, n = A.shape
+    B = np.atleast_2d(b)
+    if B.shape[1] != m:
+        raise ValueError(f"b must have length {m} (got shape {b.shape})")
+    M = pack_rows(np.hstack([A, B.T]))
+    pivots = np.asarray(_echelon(M, n, reduced=True), dtype=np.int64)
+    r = len(pivots)
+    rhs = np.arange(n, n + B.shape[0])
+    if r < m and _bits(M[r:], rhs).any():
+        raise ValueError("b is not in the column space of A")
+    x = np.zeros((B.shape[0], n), dtype=np.uint8)
+    x[:, pivots] = _bits(M[:r], rhs).T
+    return x if b.ndim == 2 else x[0]
+
+
+def in_rowspace(A: np.ndarray, v: np.ndarray) -> bool | np.ndarray:
+    """
+    Whether v is a GF(2) combination of the rows of A. v may be one length-n
+    vector (returns bool) or a (k, n) batch (returns a (k,) bool array).
+    """
+    A = np.atleast_2d(np.asarray(A, dtype=np.uint8))
+    v = np.asarray(v, dtype=np.uint8)
+    n = A.shape[1]
+    if v.shape[-1] != n:
+        raise ValueError(f"v must have length {n} (got shape {v.shape})")
+    M = pack_rows(A)
+    pivots = _echelon(M, n, reduced=True)
+    V = pack_rows(v)
+    # clear the pivot columns of v with the reduced rows, 8 pivots at a time;
+    # what is left is zero exactly when v lies in the row space
+    coeff = np.zeros((len(V), 8 * -(-len(pivots) // 8)), dtype=np.uint8)
+    coeff[:, : len(pivots)] = _bits(V, pivots)
+    packed = np.packbits(coeff, axis=1, bitorder="little")
+    for g in range(packed.shape[1]):
+        rows = M[8 * g : min(8 * g + 8, len(pivots))]
+        V ^= _combo_table(rows, list(range(len(rows))))[packed[:, g]]
+    out = ~V.any(axis=1)
+    return bool(out[0]) if v.ndim == 1 else out
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+import numpy as np
+
+
+def philox_stream(seed: int, task: int = 0, chunk: int = 0) -> np.random.Generator:
+    """
+    Counter-based random stream for the (seed, task, chunk) triple.
+
+    The Philox key is derived from (seed, task) through SeedSequence, and the
+    chunk index sits in the top word of the 256-bit counter, so every chunk
+    starts 2**192 blocks away from the previous one. The same triple gives the
+    same numbers in any process, on any number of workers, in any order.
+    """
+    key = np.random.SeedSequence(seed, spawn_key=(task,)).generate_state(2, np.uint64)
+    counter = np.array([0, 0, 0, chunk], dtype=np.uint64)
+    return np.random.Generator(np.random.Philox(key=key, counter=counter))
+
+
+def fresh_seed() -> int:
+    """A new random root seed, for runs that should still be replayable later."""
+    return int(np.random.SeedSequence().entropy)
+
+
+@dataclass(frozen=True)
+class StreamKey:
+    """
+    (seed, task) handle passed as `rng` to the chunked estimators: chunk i of
+    the run draws from philox_stream(seed, task, i), so the result depends only
+    on the seed, the task and the chunk size, not on who runs which chunk.
+    """
+
+    seed: int
+    task: int = 0
+
+    def chunk(self, index: int) -> np.random.Generator:
+        return philox_stream(self.seed, self.task, index)
+
+
+def as_generator(
+    rng: np.random.Generator | StreamKey | None, chunk: int = 0
+) -> np.random.Generator:
+    """A Generator for code that draws in one go (chunk 0 of a StreamKey)."""
+    if isinstance(rng, StreamKey):
+        return rng.chunk(chunk)
+    return rng or np.random.default_rng()
+
+
+def chunk_generators(
+    rng: np.random.Generator | StreamKey | None, sizes: Iterable[int]
+) -> Iterator[tuple[int, np.random.Generator]]:
+    """
+    Pair each chunk size with the generator it should draw from: a StreamKey
+    gives every chunk its own counter-based stream, a Generator is shared.
+    """
+    if isinstance(rng, StreamKey):
+        for i, k in enumerate(sizes):
+            yield k, rng.chunk(i)
+        return
+    rng = rng or np.random.default_rng()
+    for k in sizes:
+        yield k, rng
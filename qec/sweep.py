@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .analytics import repetition_failures, three_qubit_failures
+from .error_models import chunk_sizes
+from .rng import fresh_seed, philox_stream
+
+# code name -> basis of the 3-qubit estimator; "repetition" takes any n
+_THREE_QUBIT_BASIS = {"bitflip": "X", "phaseflip": "Z", "bitphase": "XZ"}
+CODES = ("repetition", *_THREE_QUBIT_BASIS)
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """One grid point: estimate the logical error of `code` at (n, p) with `trials`."""
+
+    code: str
+    n: int
+    p: float
+    trials: int
+
+    @property
+    def cost(self) -> int:
+        """Rough work estimate (bits sampled), used to schedule big points first."""
+        sectors = len(_THREE_QUBIT_BASIS.get(self.code, "X"))
+        return self.n * self.trials * sectors
+
+
+def sweep_grid(
+    codes: Iterable[str], ns: Iterable[int], ps: Iterable[float], trials: int
+) -> list[SweepPoint]:
+    """Cartesian (code, n, p) grid; 3-qubit codes only get n=3."""
+    points = []
+    for code, n, p in itertools.product(codes, ns, ps):
+        if code not in CODES:
+            raise ValueError(f"code must be one of {CODES} (got {code!r})")
+        if code != "repetition" and n != 3:
+            continue
+        points.append(SweepPoint(code, int(n), float(p), int(trials)))
+    return points
+
+
+def run_point(point: SweepPoint, rng: np.random.Generator) -> int:
+    """Failure count for one grid point (or one piece of it) drawn from `rng`."""
+    if point.code == "repetition":
+        method = "packed" if point.n > 64 else "dense"
+        return repetition_failures(point.n, point.p, point.trials, rng, method=method)
+    basis = _THREE_QUBIT_BASIS[point.code]
+    return three_qubit_failures(point.p, point.trials, rng, basis=basis)
+
+
+def _run_piece(point: SweepPoint, seed: int, task: int, chunk: int) -> int:
+    return run_point(point, philox_stream(seed, task, chunk))
+
+
+def run_sweep(
+    points: Sequence[SweepPoint],
+    *,
+    seed: int | None = None,
+    workers: int | None = None,
+    piece_trials: int = 1 << 20,
+) -> pd.DataFrame:
+    """
+    Evaluate every grid point across a process pool and collect a DataFrame
+    with columns code, n, p, trials, failures, rate (in the order of `points`).
+
+    Point i is split into pieces of at most `piece_trials` trials; piece j
+    draws from philox_stream(seed, i, j). Each piece is therefore fixed by
+    (seed, point, piece) alone, so a fixed seed gives the same table, bit for
+    bit, for any number of workers and any completion order. Pieces are
+    submitted in order of decreasing cost so the long ones do not end up last
+    on a single core. workers=1 runs in-process.
+    """
+    seed = fresh_seed() if seed is None else seed
+    tasks = []  # (cost, point index, piece index, piece)
+    for i, pt in enumerate(points):
+        for j, k in enumerate(chunk_sizes(pt.trials, 1, piece_trials)):
+            piece = replace(pt, trials=k)
+            tasks.append((piece.cost, i, j, piece))
+    tasks.sort(key=lambda t: t[0], reverse=True)
+    failures = [0] * len(points)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for _, i, j, piece in tasks:
+            failures[i] += _run_piece(piece, seed, i, j)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_piece, piece, seed, i, j): i
+                for _, i, j, piece in tasks
+            }
+            for fut in as_completed(futures):
+                failures[futures[fut]] += fut.result()
+    df = pd.DataFrame(
+        {
+            "code": [pt.code for pt in points],
+            "n": [pt.n for pt in points],
+            "p": [pt.p for pt in points],
+            "trials": [pt.trials for pt in points],
+            "failures": failures,
+        }
+    )
+    df["rate"] = df["failures"] / df["trials"]
+    return df
+
+
+def crn_repetition_sweep(
+    ns: Iterable[int],
+    ps: Iterable[float],
+    trials: int,
+    rng: np.random.Generator | None = None,
+    *,
+    chunk_size: int | None = None,
+) -> pd.DataFrame:
+    """
+    Repetition-code logical error over an (n, p) grid using common random numbers.
+
+    Each chunk draws one (k, max n) block of uniforms. Every p thresholds the same
+    block, and every n reads a prefix of it via a running count of flips, so the
+    whole surface costs one RNG pass and neighbouring points share their noise
+    (curves come out smooth rather than jittery). Columns: n, p, trials,
+    failures, rate, with p varying fastest; empty `ns` gives an empty frame.
+    """
+    rng = rng or np.random.default_rng()
+    ns = np.asarray(sorted(set(int(n) for n in ns)), dtype=np.int64)
+    ps = np.asarray(list(ps), dtype=float)
+    if ns.size and ns[0] < 1:
+        raise ValueError(f"code lengths must be >= 1 (got {int(ns[0])})")
+    n_max = int(ns.max()) if ns.size else 0
+    failures = np.zeros((len(ns), len(ps)), dtype=np.int64)
+    # no lengths selected: nothing to sample, return an empty frame
+    sizes = chunk_sizes(trials, n_max * max(len(ps), 1), chunk_size) if n_max else ()
+    for k in sizes:
+        u = rng.random((k, n_max))
+        for j, p in enumerate(ps):
+            weight = np.cumsum(u < p, axis=1, dtype=np.int32)[:, ns - 1]
+            failures[:, j] += (weight > ns / 2).sum(axis=0)
+    df = pd.DataFrame(
+        {
+            "n": np.repeat(ns, len(ps)),
+            "p": np.tile(ps, len(ns)),
+            "trials": trials,
+            "failures": failures.ravel(),
+        }
+    )
+    df["rate"] = df["failures"] / trials
+    return df
@@ -1,7 +1,19 @@
 import numpy as np
 
-from qec.codes import ThreeQubitBitFlip
-from qec.decoders import lookup_decoder_3q
+from qec.analytics import (
+    bitflip_mc_error,
+    lookup_logical_exact,
+    lookup_pattern_failures,
+    phaseflip_mc_error,
+    three_qubit_mc_error,
+)
+from qec.codes import ParityCheck, ThreeQubitBitFlip
+from qec.decoders import (
+    lookup_decoder_3q,
+    lookup_decoder_3q_batch,
+    lookup_decoder_3q_sparse,
+)
+from qec.error_models import bsc_flip_indices, bsc_flip_mask
 
 
 def test_unique_syndromes_for_single_X():
@@ -26,3 +38,66 @@ def test_correction_neutralizes_single_X():
         syn, corr = lookup_decoder_3q(code, e)
         post = (e + corr) % 2
         assert post.sum() == 0  # error neutralized
+
+
+def test_batch_decoder_matches_single_shot():
+    code = ThreeQubitBitFlip()
+    E = np.array([[(k >> i) & 1 for i in range(3)] for k in range(8)], dtype=int)
+    syn_b, corr_b = lookup_decoder_3q_batch(code, E)
+    for e, s, c in zip(E, syn_b, corr_b):
+        syn, corr = lookup_decoder_3q(code, e)
+        assert syn.tolist() == s.tolist()
+        assert corr.tolist() == c.tolist()
+
+
+def test_bitflip_mc_matches_analytic():
+    p = 0.1
+    rate = bitflip_mc_error(p, 200_000, rng=np.random.default_rng(0))
+    assert abs(rate - (3 * p**2 - 2 * p**3)) < 3e-3
+
+
+def test_phaseflip_matches_bitflip_for_fixed_seed():
+    a = bitflip_mc_error(0.2, 10_000, rng=np.random.default_rng(1))
+    b = phaseflip_mc_error(0.2, 10_000, rng=np.random.default_rng(1))
+    assert a == b
+
+
+def test_multinomial_sampler_matches_exact_rate():
+    rng = np.random.default_rng(0)
+    code = ThreeQubitBitFlip()
+    exact = lookup_logical_exact(code.checks, 0.1)
+    rate = three_qubit_mc_error(0.1, 10**9, rng=rng, method="multinomial")
+    assert abs(rate - exact) < 1e-4
+    assert (
+        abs(lookup_pattern_failures(code.checks, 0.1, 10**9, rng) / 1e9 - exact) < 1e-4
+    )
+
+
+def test_pipeline_is_uint8_and_accepts_int_input():
+    code = ThreeQubitBitFlip()
+    assert code.checks.S.dtype == np.uint8
+    assert bsc_flip_mask(3, 0.5, size=4).dtype == np.uint8
+    syn, corr = lookup_decoder_3q_batch(code, np.array([[0, 1, 0]], dtype=np.int64))
+    assert syn.dtype == corr.dtype == np.uint8
+    assert syn.tolist() == [[1, 1]] and corr.tolist() == [[0, 1, 0]]
+
+
+def test_sparse_flips_decode_like_dense():
+    code = ThreeQubitBitFlip()
+    flips = bsc_flip_indices(3, 0.3, 5000, rng=np.random.default_rng(0))
+    dense = flips.to_dense()
+    assert abs(dense.mean() - 0.3) < 0.02
+    syn_d, corr_d = lookup_decoder_3q_batch(code, dense)
+    syn_s, corr_s = lookup_decoder_3q_sparse(code, flips)
+    assert np.array_equal(syn_d, syn_s) and np.array_equal(corr_d, corr_s)
+
+
+def test_batched_syndromes_match_single_and_packed():
+    rng = np.random.default_rng(4)
+    checks = ParityCheck((rng.random((9, 12)) < 0.4).astype(np.uint8))
+    E = (rng.random((500, 12)) < 0.3).astype(np.uint8)
+    syn = checks.syndromes(E)
+    assert syn.dtype == np.uint8
+    assert np.array_equal(syn, np.array([checks.syndrome(e) for e in E]))
+    idx = checks.syndromes(E, packed=True)
+    assert np.array_equal(idx, syn @ (1 << np.arange(9)))
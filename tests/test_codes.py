@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from qec.analytics import _lookup_failed_patterns, lookup_logical_exact
+from qec.codes import (
+    ParityCheck,
+    RepetitionCode,
+    SparseParityCheck,
+    ThreeQubitBitFlip,
+    load_syndrome_table,
+    repetition_code,
+    syndrome_table,
+    three_qubit_code,
+)
+from qec.decoders import lookup_table
+from qec.error_models import bsc_flip_indices
+
+
+def _random_checks(m, n, seed):
+    S = (np.random.default_rng(seed).random((m, n)) < 0.2).astype(np.uint8)
+    S[1] = 0  # an empty check must survive the round trip
+    return ParityCheck(S)
+
+
+def test_sparse_checks_round_trip_losslessly():
+    dense = _random_checks(12, 40, 0)
+    sparse = dense.to_sparse()
+    assert isinstance(sparse, SparseParityCheck)
+    assert sparse.shape == (12, 40)
+    assert sparse.nnz == int(dense.S.sum())
+    assert np.array_equal(sparse.to_dense().S, dense.S)
+    again = sparse.to_dense().to_sparse()
+    assert np.array_equal(again.indptr, sparse.indptr)
+    assert np.array_equal(again.indices, sparse.indices)
+
+
+def test_sparse_syndromes_match_dense():
+    dense = _random_checks(12, 40, 1)
+    sparse = dense.to_sparse()
+    rng = np.random.default_rng(2)
+    E = (rng.random((300, 40)) < 0.3).astype(np.uint8)
+    assert np.array_equal(sparse.syndromes(E), dense.syndromes(E))
+    assert np.array_equal(
+        sparse.syndromes(E, packed=True), dense.syndromes(E, packed=True)
+    )
+    assert np.array_equal(sparse.syndrome(E[0]), dense.syndrome(E[0]))
+    flips = bsc_flip_indices(40, 0.1, 300, rng)
+    assert np.array_equal(
+        sparse.syndromes_sparse(flips), dense.syndromes(flips.to_dense())
+    )
+
+
+def test_codes_hash_by_content_and_are_cached():
+    S = np.array([[1, 1, 0], [0, 1, 1]])
+    a, b = ParityCheck(S), ParityCheck(S.astype(bool))
+    assert a == b and hash(a) == hash(b) and a.digest == b.digest
+    assert a != ParityCheck(np.array([[1, 1, 0], [1, 0, 1]]))
+    assert a != ParityCheck(np.array([[1, 1, 0, 0], [0, 1, 1, 0]]))
+    assert a.to_sparse() == b.to_sparse() and len({a.to_sparse(), b.to_sparse()}) == 1
+    S[0, 0] = 0  # the code keeps its own read-only copy
+    assert a.S[0, 0] == 1 and not a.S.flags.writeable
+    assert (
+        ThreeQubitBitFlip() == three_qubit_code()
+        and three_qubit_code() is three_qubit_code()
+    )
+    assert repetition_code(5) is repetition_code(5)
+    assert lookup_table(a) is lookup_table(b)
+
+
+def test_syndrome_table_matches_matmul_and_round_trips(tmp_path):
+    rng = np.random.default_rng(7)
+    for code, m in [
+        (ThreeQubitBitFlip(), 2),
+        (RepetitionCode(10), 9),
+        (_random_checks(12, 14, 8), 12),
+    ]:
+        table = syndrome_table(code)
+        checks = table.checks
+        assert table.table.dtype == (np.uint8 if m <= 8 else np.uint16)
+        E = (rng.random((400, checks.S.shape[1])) < 0.3).astype(np.uint8)
+        assert np.array_equal(table.syndromes(E), checks.syndromes(E))
+        assert np.array_equal(
+            table.syndromes(E, packed=True), checks.syndromes(E, packed=True)
+        )
+    path = tmp_path / "rep10.npy"
+    syndrome_table(RepetitionCode(10)).save(path)
+    loaded = load_syndrome_table(path, RepetitionCode(10))
+    assert isinstance(loaded.table, np.memmap)
+    assert np.array_equal(loaded.table, syndrome_table(RepetitionCode(10)).table)
+    with pytest.raises(ValueError):
+        load_syndrome_table(path, ParityCheck(np.eye(9, 10, dtype=np.uint8)))
+
+
+def test_cached_failure_map_is_read_only():
+    patterns, failed = _lookup_failed_patterns(three_qubit_code().checks)
+    for arr in (patterns, failed):
+        with pytest.raises(ValueError):
+            arr[:] = 1
+    assert abs(lookup_logical_exact(three_qubit_code().checks, 0.1) - 0.028) < 1e-12
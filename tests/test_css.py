@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from qec import gf2
+from qec.analytics import css_mc_error
+from qec.css import (
+    CSSCode,
+    rotated_surface_code,
+    shor_code,
+    steane_code,
+    toric_code,
+)
+from qec.decoders import union_find_decoder
+from qec.error_models import Depolarizing, all_error_patterns
+
+
+@pytest.mark.parametrize("make", [shor_code, steane_code])
+def test_css_codes_have_one_logical_and_correct_single_paulis(make):
+    code = make()
+    assert code.k == 1
+    assert gf2.matmul(code.logical_x, code.logical_z.T).tolist() == [[1]]
+    eye = np.eye(code.n, dtype=np.uint8)
+    zero = np.zeros_like(eye)
+    for x, z in [(eye, zero), (zero, eye), (eye, eye)]:  # every X, Z and Y
+        assert not code.logical_failures(x, z).any()
+        cx, cz = code.decode(x, z)
+        sx, sz = code.syndromes(x ^ cx, z ^ cz)
+        assert not sx.any() and not sz.any()
+
+
+def test_failure_table_matches_stabilizer_membership():
+    code = steane_code()
+    patterns = all_error_patterns(code.n)
+    cx, _ = code.decode(patterns, patterns)
+    # a decoded X error is fine iff the residual is a product of X checks
+    expected = ~gf2.in_rowspace(code.hx.S, patterns ^ cx)
+    zero = np.zeros_like(patterns)
+    assert np.array_equal(code.logical_failures(patterns, zero), expected)
+
+
+def test_css_rejects_anticommuting_checks():
+    with pytest.raises(ValueError):
+        CSSCode(np.array([[1, 1, 0]]), np.array([[0, 1, 1]]))
+
+
+def test_css_mc_error_matches_independent_sector_rates():
+    code = steane_code()
+    p = 0.05
+    patterns = all_error_patterns(code.n)
+    w = patterns.sum(axis=1)
+    zero = np.zeros_like(patterns)
+    fail_one = (p**w * (1 - p) ** (code.n - w))[
+        code.logical_failures(patterns, zero)
+    ].sum()
+    exact = 1 - (1 - fail_one) ** 2
+    rate = css_mc_error(code, p, 200_000, np.random.default_rng(3))
+    assert abs(rate - exact) < 0.003
+    assert 0 < css_mc_error(code, Depolarizing(p), 20_000, np.random.default_rng(4))
+
+
+@pytest.mark.parametrize(
+    "make,d,n,k", [(rotated_surface_code, 5, 25, 1), (toric_code, 4, 32, 2)]
+)
+def test_lattice_codes_have_expected_parameters(make, d, n, k):
+    code = make(d)
+    hx, hz = code.hx.to_dense().S, code.hz.to_dense().S
+    assert code.n == n and code.k == k
+    assert n - gf2.rank(hx) - gf2.rank(hz) == k
+    # the closed-form logicals are genuine: not products of checks, paired up
+    assert not gf2.in_rowspace(hx, code.logical_x).any()
+    assert not gf2.in_rowspace(hz, code.logical_z).any()
+    assert np.array_equal(
+        gf2.matmul(code.logical_x, code.logical_z.T), np.eye(k, dtype=np.uint8)
+    )
+    assert code.qubit_coords.shape == (n, 2)
+    assert [len(c) for c in code.check_coords] == [len(hx), len(hz)]
+
+
+def test_small_lattice_codes_decode_single_errors():
+    for code in (rotated_surface_code(3), toric_code(3)):
+        eye = np.eye(code.n, dtype=np.uint8)
+        zero = np.zeros_like(eye)
+        for x, z in [(eye, zero), (zero, eye), (eye, eye)]:
+            assert not code.logical_failures(x, z).any()
+
+
+def test_union_find_corrects_up_to_half_the_distance():
+    code = rotated_surface_code(5)
+    eye = np.eye(code.n, dtype=np.uint8)
+    pairs = (eye[:, None] | eye[None, :]).reshape(-1, code.n)  # weight 1 and 2
+    zero = np.zeros_like(pairs)
+    for x, z in [(pairs, zero), (zero, pairs), (pairs, pairs)]:
+        assert not code.logical_failures(x, z, method="union_find").any()
+
+
+@pytest.mark.parametrize("code", [rotated_surface_code(9), toric_code(6)])
+def test_union_find_reproduces_syndromes(code):
+    x = (np.random.default_rng(2).random((500, code.n)) < 0.1).view(np.uint8)
+    for checks in (code.hx, code.hz):
+        syn = checks.syndromes(x)
+        assert np.array_equal(checks.syndromes(union_find_decoder(checks, syn)), syn)
+
+
+def test_surface_code_rates_show_a_threshold():
+    # below threshold larger codes do better, above it they do worse
+    def rate(d, p):
+        return css_mc_error(rotated_surface_code(d), p, 4000, np.random.default_rng(d))
+
+    assert rate(7, 0.02) < rate(3, 0.02)
+    assert rate(7, 0.2) > rate(3, 0.2)
+
+
+def test_decoder_method_is_checked():
+    x = np.zeros((1, 25), dtype=np.uint8)
+    with pytest.raises(ValueError, match="n <= "):
+        rotated_surface_code(5).decode(x, x, method="lookup")
+    with pytest.raises(ValueError, match="at most two checks"):
+        steane_code().decode(x[:, :7], x[:, :7], method="union_find")
+    with pytest.raises(ValueError, match="no correction"):
+        union_find_decoder(toric_code(4).hz, np.eye(1, 16, dtype=np.uint8))
+
+
+def test_large_surface_code_builds_sparse_checks():
+    code = rotated_surface_code(51)
+    assert code.hx.shape == (1300, 2601) and code.hz.shape == (1300, 2601)
+    assert code.hx.nnz + code.hz.nnz == 4 * 50 * 50 + 2 * 2 * 50
+    x = np.zeros((1, code.n), dtype=np.uint8)
+    x[0, code.n // 2] = 1  # a bulk X error lights up its two neighbouring Z checks
+    assert code.syndromes(x, np.zeros_like(x))[0].sum() == 2
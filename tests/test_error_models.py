@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from qec.analytics import (
+    repetition_erasure_mc_error,
+    repetition_mc_error,
+    three_qubit_erasure_mc_error,
+    three_qubit_mc_error,
+)
+from qec.codes import ParityCheck, ThreeQubitBitFlip
+from qec.decoders import (
+    MAX_ERASURE_TABLE_QUBITS,
+    erasure_lookup_table,
+    lookup_decoder_erasure,
+)
+from qec.error_models import (
+    BSC,
+    BiasedXZ,
+    Depolarizing,
+    Erasure,
+    GilbertElliott,
+    RandomPool,
+    bsc_flip_mask,
+    erasure_flip_mask,
+)
+
+
+@pytest.mark.parametrize(
+    "model, px, pz, py",
+    [
+        (BSC(0.1), 0.1, 0.0, 0.0),
+        (BSC(0.1, "Z"), 0.0, 0.1, 0.0),
+        (BiasedXZ(0.1, 0.2), 0.1, 0.2, 0.02),
+        (Depolarizing(0.3), 0.2, 0.2, 0.1),
+        (Erasure(0.4), 0.2, 0.2, 0.1),
+    ],
+)
+def test_model_marginals(model, px, pz, py):
+    x, z = model.sample(100_000, 3, np.random.default_rng(0))
+    assert x.shape == z.shape == (100_000, 3)
+    assert abs(x.mean() - px) < 0.01
+    assert abs(z.mean() - pz) < 0.01
+    assert abs((x & z).mean() - py) < 0.01
+
+
+def test_estimators_accept_models():
+    rng = np.random.default_rng(0)
+    p = 0.1
+    three = 3 * p**2 - 2 * p**3
+    assert abs(three_qubit_mc_error(BSC(p), 100_000, rng) - three) < 3e-3
+    assert three_qubit_mc_error(BSC(p), 1000, rng, basis="Z") == 0.0
+    # depolarizing: each plane is flipped with prob 2p/3
+    q = 2 * 0.15 / 3
+    rate = three_qubit_mc_error(Depolarizing(0.15), 100_000, rng, basis="Z")
+    assert abs(rate - (3 * q**2 - 2 * q**3)) < 3e-3
+    with pytest.raises(ValueError):
+        repetition_mc_error(5, Depolarizing(0.1), 10, method="packed")
+
+
+@pytest.mark.parametrize("p_gb, p_bg", [(0.05, 0.2), (0.9, 0.8)])
+def test_gilbert_elliott_matches_markov_chain(p_gb, p_bg):
+    model = GilbertElliott(p_gb, p_bg)
+    bad = model.states(200_000, 8, np.random.default_rng(0))
+    pi_bad = p_gb / (p_gb + p_bg)
+    assert np.allclose(bad.mean(axis=0), pi_bad, atol=0.01)
+    # P(bad at t and t+1) = pi_bad * (1 - p_bg)
+    assert abs((bad[:, 3] & bad[:, 4]).mean() - pi_bad * (1 - p_bg)) < 0.01
+
+
+def test_bursts_hurt_majority_vote():
+    rng = np.random.default_rng(0)
+    bursty = GilbertElliott(0.02, 0.1, p_good=0.0, p_bad=0.6)
+    iid = BSC(bursty.mean_flip_rate)
+    assert repetition_mc_error(7, bursty, 50_000, rng) > 2 * repetition_mc_error(
+        7, iid, 50_000, rng
+    )
+
+
+def test_erasure_decoders_only_fail_on_full_erasure():
+    rng = np.random.default_rng(0)
+    pe = 0.3  # pure erasure: only an all-erased word is a coin flip
+    assert abs(three_qubit_erasure_mc_error(pe, 400_000, rng) - pe**3 / 2) < 1.5e-3
+    assert abs(repetition_erasure_mc_error(3, pe, 400_000, rng) - pe**3 / 2) < 1.5e-3
+
+
+def test_erasure_lookup_uses_erased_positions():
+    checks = ThreeQubitBitFlip().checks
+    # qubits 1 and 2 flipped; plain lookup would blame qubit 3, erasure info fixes it
+    e = np.array([[1, 1, 0]], dtype=np.uint8)
+    erased = np.array([[1, 1, 0]], dtype=np.uint8)
+    _, corr = lookup_decoder_erasure(checks, e, erased)
+    assert corr.tolist() == [[1, 1, 0]]
+
+
+def test_erasure_model_shares_the_erasure_flip_mask_channel():
+    x, z = Erasure(0.3).sample(1000, 5, np.random.default_rng(4))
+    _, flips = erasure_flip_mask(5, 0.3, size=1000, rng=np.random.default_rng(4))
+    assert np.array_equal(x, flips)
+    n = MAX_ERASURE_TABLE_QUBITS + 1
+    with pytest.raises(ValueError, match="erasure tables"):
+        erasure_lookup_table(ParityCheck(np.eye(n - 1, n, dtype=np.uint8)))
+
+
+def test_random_pool_serves_the_generator_stream():
+    pool = RandomPool(np.random.default_rng(0), block=7)
+    parts = [pool.random(k) for k in (1, 3, (2, 2), 10, None, 20, 2, 2)]
+    served = np.concatenate([np.ravel(x) for x in parts])
+    assert np.array_equal(served, np.random.default_rng(0).random(len(served)))
+    assert bsc_flip_mask(3, 0.5, size=4, rng=pool).shape == (4, 3)
@@ -0,0 +1,67 @@
+from functools import partial
+
+import numpy as np
+
+from qec.analytics import (
+    repetition_failures,
+    repetition_logical_exact,
+    repetition_rare_error,
+    three_qubit_rare_error,
+)
+from qec.estimation import (
+    adaptive_mc,
+    clopper_pearson_interval,
+    importance_sample,
+    wilson_interval,
+)
+
+
+def test_intervals_contain_estimate():
+    for ci in (wilson_interval, clopper_pearson_interval):
+        low, high = ci(30, 1000)
+        assert 0.0 <= low < 0.03 < high <= 1.0
+        assert ci(0, 1000)[0] == 0.0
+
+
+def test_adaptive_stops_at_relative_error():
+    res = adaptive_mc(
+        partial(repetition_failures, 5, 0.1),
+        rel_err=0.05,
+        rng=np.random.default_rng(0),
+    )
+    assert res.converged
+    assert (res.high - res.low) / 2 <= 0.05 * res.estimate
+    assert res.low <= repetition_logical_exact(5, 0.1) <= res.high
+
+
+def test_adaptive_respects_trial_budget():
+    res = adaptive_mc(
+        partial(repetition_failures, 9, 0.0), rel_err=0.1, batch=1000, max_trials=5000
+    )
+    assert not res.converged
+    assert res.trials == 5000 and res.estimate == 0.0
+
+
+def test_rare_event_estimators_reach_low_p():
+    exact9 = repetition_logical_exact(9, 1e-3)  # ~1.3e-13, invisible to plain MC
+    exact3 = repetition_logical_exact(3, 1e-3)
+    for method in ("importance", "stratified"):
+        rng = np.random.default_rng(0)
+        res = repetition_rare_error(9, 1e-3, 20_000, rng=rng, method=method)
+        assert abs(res.estimate - exact9) <= 4 * res.stderr + 1e-9 * exact9
+        res = three_qubit_rare_error(1e-3, 20_000, rng=rng, method=method)
+        assert abs(res.estimate - exact3) <= 4 * res.stderr + 1e-9 * exact3
+
+
+def test_importance_default_tilt_handles_long_codes_and_high_p():
+    for n, p in ((101, 0.01), (7, 0.7)):
+        res = importance_sample(
+            lambda e, n=n: e.sum(axis=1) > n // 2,
+            n,
+            p,
+            20_000,
+            rng=np.random.default_rng(1),
+        )
+        exact = repetition_logical_exact(n, p)
+        assert abs(res.estimate - exact) <= 4 * res.stderr
+        assert res.stderr < 0.05 * exact
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from qec import gf2
+from qec.codes import ParityCheck
+
+
+def _mod2(A, B):
+    return (A.astype(np.int64) @ B.astype(np.int64)) % 2
+
+
+def _random(m, n, seed, density=0.5):
+    A = (np.random.default_rng(seed).random((m, n)) < density).astype(np.uint8)
+    if m > 2:
+        A[-1] = A[0] ^ A[1]  # force a dependent row
+    return A
+
+
+def test_pack_round_trip():
+    A = _random(5, 130, 0)
+    words = gf2.pack_rows(A)
+    assert words.shape == (5, 3) and words.dtype == np.uint64
+    assert np.array_equal(gf2.unpack_rows(words, 130), A)
+
+
+@pytest.mark.parametrize("m,n,seed", [(6, 9, 1), (20, 20, 2), (40, 70, 3), (70, 33, 4)])
+def test_row_reduce_rank_and_nullspace(m, n, seed):
+    A = _random(m, n, seed)
+    R, pivots = gf2.row_reduce(A)
+    r = gf2.rank(A)
+    assert R.shape == (r, n) and r < m
+    assert np.array_equal(R[:, pivots], np.eye(r, dtype=np.uint8))
+    assert np.all(np.diff(pivots) > 0)
+    # same row space: every row of A reduces to zero against R and vice versa
+    assert gf2.in_rowspace(R, A).all() and gf2.in_rowspace(A, R).all()
+    N = gf2.nullspace(A)
+    assert N.shape == (n - r, n) and gf2.rank(N) == n - r
+    assert not _mod2(A, N.T).any()
+
+
+def test_solve_and_membership():
+    rng = np.random.default_rng(5)
+    A = _random(30, 50, 6)
+    X = (rng.random((8, 50)) < 0.5).astype(np.uint8)
+    B = _mod2(X, A.T)  # (8, 30) right-hand sides in the column space
+    assert np.array_equal(_mod2(gf2.solve(A, B), A.T), B)
+    assert np.array_equal(_mod2(A, gf2.solve(A, B[0])), B[0])
+    bad = B[0].copy()
+    bad[-1] ^= bad[0] ^ bad[1] ^ 1  # breaks the forced row dependency
+    with pytest.raises(ValueError):
+        gf2.solve(A, bad)
+    combo = _mod2((rng.random(30) < 0.5).astype(np.uint8), A)
+    assert gf2.in_rowspace(A, combo)
+    units = np.eye(50, dtype=np.uint8)
+    expected = [gf2.rank(np.vstack([A, u])) == gf2.rank(A) for u in units]
+    assert list(gf2.in_rowspace(A, units)) == expected and not all(expected)
+
+
+def test_parity_check_rank_and_logicals():
+    rep = ParityCheck(np.array([[1, 1, 0, 0], [0, 1, 1, 0], [0, 0, 1, 1]]))
+    assert rep.rank == 3
+    assert np.array_equal(rep.logicals(), [[1, 1, 1, 1]])
+    assert rep.to_sparse().rank == 3
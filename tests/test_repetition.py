@@ -1,6 +1,23 @@
 import numpy as np
 
-from qec.analytics import repetition_mc_error
+from qec.analytics import (
+    css_mc_error,
+    lookup_logical_exact,
+    repetition_erasure_mc_error,
+    repetition_failures,
+    repetition_logical_exact,
+    repetition_mc_error,
+    three_qubit_mc_error,
+)
+from qec.codes import RepetitionCode, ThreeQubitBitFlip
+from qec.css import steane_code
+from qec.decoders import lookup_decoder_3q_batch, lookup_table
+from qec.error_models import (
+    all_error_patterns,
+    bsc_flip_mask,
+    bsc_flip_mask_chunks,
+    bsc_packed_mask,
+)
 
 
 def test_repetition_bounds():
@@ -10,3 +27,81 @@ def test_repetition_bounds():
 def test_repetition_p_zero_is_zero():
     # With p=0, no flips -> zero logical error
     assert repetition_mc_error(5, 0.0, 2000) == 0.0
+
+
+def test_packed_mask_padding_and_rate():
+    words = bsc_packed_mask(70, 0.3, 5000, rng=np.random.default_rng(0))
+    assert words.shape == (5000, 2) and words.dtype == np.uint64
+    assert not (words[:, 1] >> np.uint64(6)).any()  # bits past n stay clear
+    assert abs(np.bitwise_count(words).sum() / (70 * 5000) - 0.3) < 0.005
+    # p is rounded to 32 binary digits: 0.1 spends 31 words, 0.25 just 2
+    for p, words_used in ((0.1, 31), (0.25, 2)):
+        rng = np.random.default_rng(1)
+        bsc_packed_mask(64, p, 10, rng=rng)
+        rest = np.random.default_rng(1)
+        for _ in range(words_used):
+            rest.integers(0, 2**64 - 1, size=(10, 1), dtype=np.uint64, endpoint=True)
+        assert rng.random() == rest.random()
+
+
+def test_packed_repetition_matches_binomial_tail():
+    rate = repetition_mc_error(
+        5, 0.2, 400_000, rng=np.random.default_rng(0), method="packed"
+    )
+    assert abs(rate - 0.05792) < 2e-3
+    assert repetition_mc_error(101, 0.0, 1000, method="packed") == 0.0
+
+
+def test_exact_matches_closed_forms():
+    p = np.array([0.0, 0.1, 0.5, 1.0])
+    three = 3 * p**2 - 2 * p**3
+    assert np.allclose(repetition_logical_exact(3, p), three)
+    assert np.allclose(lookup_logical_exact(ThreeQubitBitFlip().checks, p), three)
+    assert np.isclose(repetition_logical_exact(5, 0.2), 0.05792)
+
+
+def test_chunking_does_not_change_the_stream():
+    counts = {
+        repetition_failures(7, 0.3, 50_000, np.random.default_rng(3), chunk_size=c)
+        for c in (333, 4096, None)
+    }
+    assert len(counts) == 1
+
+
+def test_flip_mask_chunks_concatenate_to_one_draw():
+    chunks = list(bsc_flip_mask_chunks(7, 0.3, 1000, 333, np.random.default_rng(5)))
+    assert [len(c) for c in chunks] == [333, 333, 333, 1]
+    whole = bsc_flip_mask(7, 0.3, size=1000, rng=np.random.default_rng(5))
+    assert np.array_equal(np.concatenate(chunks), whole)
+
+
+def test_zero_trials_give_nan():
+    assert np.isnan(repetition_mc_error(5, 0.1, 0))
+    assert np.isnan(three_qubit_mc_error(0.1, 0))
+    assert np.isnan(repetition_erasure_mc_error(3, 0.1, 0))
+    assert np.isnan(css_mc_error(steane_code(), 0.1, 0))
+
+
+def test_sparse_repetition_matches_binomial_tail():
+    rate = repetition_mc_error(
+        5, 0.2, 400_000, rng=np.random.default_rng(0), method="sparse"
+    )
+    assert abs(rate - 0.05792) < 2e-3
+
+
+def test_repetition_code_decoding_matches_majority():
+    for n in (3, 4, 5, 6, 7):
+        code = RepetitionCode(n)
+        E = all_error_patterns(n)
+        syn, corr = code.decode(E)
+        assert np.array_equal(syn, code.checks.syndromes(E))
+        assert np.array_equal(code.syndromes(corr), syn)
+        table = lookup_table(code.checks.to_dense())[code.syndromes(E, packed=True)]
+        # both are minimum weight; on even-n ties they may pick different halves
+        assert np.array_equal(corr.sum(axis=1), table.sum(axis=1))
+        if n % 2:
+            assert np.array_equal(corr, table)
+        residual = E ^ corr
+        assert np.array_equal(residual.any(axis=1), code.logical_failures(E))
+    _, corr3 = lookup_decoder_3q_batch(ThreeQubitBitFlip(), all_error_patterns(3))
+    assert np.array_equal(RepetitionCode(3).decode(all_error_patterns(3))[1], corr3)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from qec.analytics import repetition_failures
+from qec.estimation import adaptive_mc
+from qec.rng import StreamKey, philox_stream
+
+
+def test_philox_streams_are_fixed_by_seed_task_and_chunk():
+    a = philox_stream(1, 2, 3).random(8)
+    assert np.array_equal(a, philox_stream(1, 2, 3).random(8))
+    for other in [(1, 2, 4), (1, 3, 3), (2, 2, 3)]:
+        assert not np.array_equal(a, philox_stream(*other).random(8))
+
+
+def test_stream_key_chunks_replay_manually():
+    key = StreamKey(seed=11, task=5)
+    total = repetition_failures(5, 0.2, 2500, key, chunk_size=1000)
+    manual = sum(
+        repetition_failures(5, 0.2, k, philox_stream(11, 5, i))
+        for i, k in enumerate([1000, 1000, 500])
+    )
+    assert total == manual
+
+
+def test_adaptive_mc_replays_with_stream_key():
+    def count(k, gen):
+        return repetition_failures(3, 0.1, k, gen)
+
+    a = adaptive_mc(count, rel_err=0.05, batch=1000, rng=StreamKey(9))
+    b = adaptive_mc(count, rel_err=0.05, batch=1000, rng=StreamKey(9))
+    assert (a.trials, a.failures) == (b.trials, b.failures)
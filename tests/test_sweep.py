@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from qec.analytics import repetition_logical_exact
+from qec.sweep import crn_repetition_sweep, run_sweep, sweep_grid
+
+
+def test_grid_skips_invalid_three_qubit_lengths():
+    pts = sweep_grid(["repetition", "bitflip"], [3, 5], [0.1, 0.2], 100)
+    assert len(pts) == 6
+    assert all(pt.n == 3 for pt in pts if pt.code == "bitflip")
+
+
+def test_sweep_is_reproducible_across_worker_counts():
+    pts = sweep_grid(["repetition", "phaseflip"], [1, 3, 5], [0.05, 0.2], 2000)
+    serial = run_sweep(pts, seed=7, workers=1)
+    pooled = run_sweep(pts, seed=7, workers=2)
+    assert serial.equals(pooled)
+    rep = serial[serial.code == "repetition"]
+    exact = repetition_logical_exact(rep.n.to_numpy(), rep.p.to_numpy())
+    assert np.all(np.abs(rep.rate.to_numpy() - exact) < 0.05)
+
+
+def test_crn_sweep_matches_exact_and_is_monotone_in_p():
+    df = crn_repetition_sweep(
+        [1, 3, 5, 9], [0.05, 0.1, 0.2], 40_000, rng=np.random.default_rng(0)
+    )
+    assert len(df) == 12
+    exact = repetition_logical_exact(df.n.to_numpy(), df.p.to_numpy())
+    assert np.all(np.abs(df.rate.to_numpy() - exact) < 0.01)
+    # shared uniforms: more noise can only add flips, so rates never drop with p
+    for _, grp in df.groupby("n"):
+        assert np.all(np.diff(grp.failures.to_numpy()) >= 0)
+
+
+def test_split_points_are_reproducible_across_worker_counts():
+    pts = sweep_grid(["repetition", "bitflip"], [3, 7], [0.1], 5000)
+    serial = run_sweep(pts, seed=3, workers=1, piece_trials=1500)
+    pooled = run_sweep(pts, seed=3, workers=2, piece_trials=1500)
+    assert serial.equals(pooled)
+    assert not serial.equals(run_sweep(pts, seed=4, workers=1, piece_trials=1500))
+
+
+def test_crn_sweep_handles_empty_and_rejects_zero_length():
+    df = crn_repetition_sweep([], [0.1], 1000, rng=np.random.default_rng(0))
+    assert df.empty
+    assert list(df.columns) == ["n", "p", "trials", "failures", "rate"]
+    with pytest.raises(ValueError):
+        crn_repetition_sweep([0, 3], [0.1], 1000)